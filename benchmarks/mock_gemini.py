@@ -0,0 +1,332 @@
+"""ローカルの Gemini 代替サーバー（負荷試験用）
+
+API の利用枠を使わずに、Streamlit 版やデスクトップアプリの負荷試験を行うための
+generateContent / streamGenerateContent（SSE）互換サーバー。
+
+    # 疑似応答（遅延・エラー率・出力速度を指定）
+    python -m benchmarks.mock_gemini --latency lognormal:800,0.4 --error-rate 0.05 --tps 120
+
+    # 本物の API に中継して応答を記録 → 以後は記録を再生
+    python -m benchmarks.mock_gemini --mode record --cassette benchmarks/cassettes
+    python -m benchmarks.mock_gemini --mode replay --cassette benchmarks/cassettes
+
+アプリ側は環境変数（Streamlit は secrets でも可）で接続先を切り替える。
+
+    GEMINI_BASE_URL=http://127.0.0.1:8765 GEMINI_API_KEY=dummy streamlit run streamlit_app.py
+
+遅延の指定（ミリ秒）: "300"（固定）/ "uniform:200,600" / "normal:400,100" /
+"lognormal:400,0.5"（中央値, σ）
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+from logic.storage import write_atomic
+
+
+UPSTREAM_URL = "https://generativelanguage.googleapis.com"
+DEFAULT_PORT = 8765
+DEFAULT_CHUNK_CHARS = 40
+
+ERROR_STATUS = {
+    429: "RESOURCE_EXHAUSTED",
+    500: "INTERNAL",
+    503: "UNAVAILABLE",
+}
+
+
+def parse_latency(spec):
+    """遅延の指定から「ミリ秒を返す関数」を作る"""
+    kind, _, args = str(spec).partition(":")
+    if not args:
+        value = float(kind)
+        return lambda: value
+
+    values = [float(v) for v in args.split(",")]
+    if kind == "uniform":
+        return lambda: random.uniform(values[0], values[1])
+    if kind == "normal":
+        return lambda: max(0.0, random.gauss(values[0], values[1]))
+    if kind == "lognormal":
+        median, sigma = values
+        return lambda: random.lognormvariate(0.0, sigma) * median
+    raise ValueError(f"遅延の指定が正しくありません: {spec}")
+
+
+def canned_text(prompt):
+    """プロンプトの種類に合わせた疑似応答"""
+    if "【TITLE】" in prompt:
+        from benchmarks.stub_gemini import make_tagged_article
+
+        return make_tagged_article()
+    if "【タイトル】" in prompt:
+        body = "利上げは家計と企業の双方に影響します。" * 20
+        return (
+            "【タイトル】\n日銀の追加利上げで何が変わるのか\n\n"
+            f"【無料公開部分】\n{body}\n\n"
+            "【ここから有料】\n\n"
+            f"【有料部分】\n{body * 2}\n"
+        )
+    if "X（旧Twitter）" in prompt:
+        return "\n\n".join(f"{i}/5 日銀が追加利上げを決めました。要点を整理します。" for i in range(1, 6))
+    return "デイリーニュースCFOのマークです。" + "今日のニュースを3分で解説します。" * 30
+
+
+def response_json(text, model):
+    return {
+        "candidates": [{
+            "content": {"role": "model", "parts": [{"text": text}]},
+            "finishReason": "STOP",
+            "index": 0,
+        }],
+        "usageMetadata": {"candidatesTokenCount": len(text)},
+        "modelVersion": model,
+    }
+
+
+def prompt_text(body):
+    """リクエストのプロンプト部分（contents の text をつなげたもの）"""
+    texts = []
+    for content in body.get("contents", []):
+        for part in content.get("parts", []):
+            texts.append(part.get("text", ""))
+    return "".join(texts)
+
+
+# ===== 記録の保存・再生 =====
+class Cassette:
+    """リクエスト（モデル・種類・本文）のハッシュごとに応答を JSON で保存する"""
+
+    def __init__(self, directory):
+        self.directory = directory
+
+    @staticmethod
+    def make_key(path, body):
+        payload = json.dumps({"path": path, "body": body}, ensure_ascii=False, sort_keys=True)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.json")
+
+    def load(self, key):
+        try:
+            with open(self._path(key), encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def store(self, key, record):
+        # 同じキーの記録が並行して届いても一時ファイルが衝突しないようにする
+        write_atomic(self._path(key), json.dumps(record, ensure_ascii=False, indent=2))
+
+
+class MockConfig:
+    def __init__(self, mode="mock", latency="300", error_rate=0.0,
+                 error_codes=(429, 503), tps=100.0, chunk_chars=DEFAULT_CHUNK_CHARS,
+                 cassette=None, upstream=UPSTREAM_URL):
+        self.mode = mode
+        self.latency = parse_latency(latency)
+        self.error_rate = error_rate
+        self.error_codes = list(error_codes)
+        self.tps = tps
+        self.chunk_chars = chunk_chars
+        self.cassette = Cassette(cassette) if cassette else None
+        self.upstream = upstream.rstrip("/")
+        self.stats = {"requests": 0, "errors": 0, "replayed": 0, "recorded": 0}
+        self.stats_lock = threading.Lock()
+
+    def count(self, key):
+        with self.stats_lock:
+            self.stats[key] += 1
+
+
+class MockGeminiHandler(BaseHTTPRequestHandler):
+    config = MockConfig()
+
+    def log_message(self, format, *args):
+        pass
+
+    # ===== ルーティング =====
+    def do_POST(self):
+        config = self.config
+        config.count("requests")
+
+        url = urlsplit(self.path)
+        model, _, method = url.path.rpartition("/")[2].partition(":")
+        length = int(self.headers.get("Content-Length") or 0)
+        raw_body = self.rfile.read(length)
+        try:
+            body = json.loads(raw_body or b"{}")
+        except ValueError:
+            return self.send_error_json(400, "INVALID_ARGUMENT", "JSON を解析できません")
+
+        if method not in ("generateContent", "streamGenerateContent"):
+            return self.send_error_json(404, "NOT_FOUND", f"未対応のメソッド: {method}")
+        stream = method == "streamGenerateContent"
+
+        # 最初のバイトまでの遅延（記録モードは本物の遅延をそのまま使う）
+        if config.mode != "record":
+            time.sleep(config.latency() / 1000)
+
+            if random.random() < config.error_rate:
+                config.count("errors")
+                code = random.choice(config.error_codes)
+                return self.send_error_json(code, ERROR_STATUS.get(code, "UNKNOWN"), "擬似エラー")
+
+        key = Cassette.make_key(url.path, body)
+        if config.mode == "record":
+            return self.record(url, raw_body, key, stream)
+        if config.mode == "replay":
+            record = config.cassette.load(key)
+            if record is None:
+                return self.send_error_json(404, "NOT_FOUND", "記録がありません（record モードで記録してください）")
+            config.count("replayed")
+            return self.send_text(record["chunks"], model, stream)
+
+        text = canned_text(prompt_text(body))
+        chunks = [text[i:i + config.chunk_chars] for i in range(0, len(text), config.chunk_chars)]
+        return self.send_text(chunks, model, stream)
+
+    # ===== 応答 =====
+    def send_error_json(self, code, status, message):
+        payload = json.dumps({"error": {"code": code, "message": message, "status": status}})
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload.encode("utf-8"))))
+        self.end_headers()
+        self.wfile.write(payload.encode("utf-8"))
+
+    def send_text(self, chunks, model, stream):
+        """チャンクを出力速度（トークン/秒、日本語は1文字≒1トークン）に合わせて返す"""
+        if not stream:
+            text = "".join(chunks)
+            time.sleep(len(text) / self.config.tps if self.config.tps else 0)
+            payload = json.dumps(response_json(text, model), ensure_ascii=False).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream; charset=utf-8")
+        self.end_headers()
+        for chunk in chunks:
+            if self.config.tps:
+                time.sleep(len(chunk) / self.config.tps)
+            event = json.dumps(response_json(chunk, model), ensure_ascii=False)
+            try:
+                self.wfile.write(f"data: {event}\r\n\r\n".encode("utf-8"))
+                self.wfile.flush()
+            except (BrokenPipeError, ConnectionResetError):
+                return  # クライアントが生成を中止した
+
+    # ===== 記録 =====
+    def record(self, url, raw_body, key, stream):
+        import requests
+
+        config = self.config
+        target = f"{config.upstream}{self.path}"
+        headers = {
+            "Content-Type": "application/json",
+            "x-goog-api-key": self.headers.get("x-goog-api-key", ""),
+        }
+        response = requests.post(target, data=raw_body, headers=headers, stream=stream, timeout=120)
+
+        if response.status_code != 200:
+            # エラーは記録せずにそのまま返す
+            self.send_response(response.status_code)
+            self.send_header("Content-Type", response.headers.get("Content-Type", "application/json"))
+            self.end_headers()
+            self.wfile.write(response.content)
+            return
+
+        chunks = []
+        if stream:
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream; charset=utf-8")
+            self.end_headers()
+            # バイト列のまま行に分ける（文字列の splitlines は U+2028 などでも分割してしまう）
+            for raw_line in response.iter_lines():
+                line = raw_line.decode("utf-8")
+                if not line.startswith("data:"):
+                    continue
+                chunks.append(_event_text(json.loads(line[5:])))
+                self.wfile.write(f"{line}\r\n\r\n".encode("utf-8"))
+                self.wfile.flush()
+        else:
+            data = response.json()
+            chunks.append(_event_text(data))
+            payload = json.dumps(data, ensure_ascii=False).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        config.cassette.store(key, {"path": url.path, "chunks": chunks})
+        config.count("recorded")
+
+
+def _event_text(data):
+    texts = []
+    for candidate in data.get("candidates", []):
+        for part in candidate.get("content", {}).get("parts", []):
+            texts.append(part.get("text", ""))
+    return "".join(texts)
+
+
+def make_server(config, host="127.0.0.1", port=DEFAULT_PORT):
+    handler = type("Handler", (MockGeminiHandler,), {"config": config})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="ローカルの Gemini 代替サーバー")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--mode", choices=["mock", "record", "replay"], default="mock")
+    parser.add_argument("--latency", default="300", help="最初の応答までの遅延（ミリ秒）")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="擬似エラーの割合（0〜1）")
+    parser.add_argument("--error-codes", default="429,503", help="擬似エラーの HTTP ステータス")
+    parser.add_argument("--tps", type=float, default=100.0, help="出力速度（トークン/秒、0 で待たない）")
+    parser.add_argument("--chunk-chars", type=int, default=DEFAULT_CHUNK_CHARS)
+    parser.add_argument("--cassette", default=os.path.join("benchmarks", "cassettes"),
+                        help="record / replay で使う保存先")
+    parser.add_argument("--upstream", default=UPSTREAM_URL)
+    args = parser.parse_args(argv)
+
+    config = MockConfig(
+        mode=args.mode,
+        latency=args.latency,
+        error_rate=args.error_rate,
+        error_codes=[int(code) for code in args.error_codes.split(",") if code],
+        tps=args.tps,
+        chunk_chars=args.chunk_chars,
+        cassette=args.cassette if args.mode != "mock" else None,
+        upstream=args.upstream,
+    )
+    server = make_server(config, args.host, args.port)
+    print(f"Gemini 代替サーバー（{args.mode}）: http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        print(f"統計: {config.stats}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,436 @@
+"""オフラインのベンチマーク
+
+ネットワークと Gemini API を使わずに、主な処理の所要時間を測る。
+
+- RSS：benchmarks/fixtures の Yahoo!ニュース RSS をローカルの HTTP サーバーで配信
+- Gemini：benchmarks/stub_gemini.py のスタブクライアント
+
+    python -m benchmarks.run -o bench.json                 # 計測して JSON に保存
+    python -m benchmarks.run --compare bench.json          # 前回の結果と比較
+    python -m benchmarks.run --filter prompt               # 名前で絞り込み
+    python -m benchmarks.run --record                      # 本番の RSS でフィクスチャを更新
+
+比較では中央値が threshold（既定 20%）以上遅くなったものを回帰として表示し、
+終了コード 1 を返す（CI で使える）。
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+from functools import lru_cache, partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(BENCH_DIR)
+FIXTURES_DIR = os.path.join(BENCH_DIR, "fixtures")
+
+# (カテゴリ, フィクスチャ名) の順番は logic.news_fetch.RSS_URLS と同じ
+FIXTURES = [
+    ("国内", "domestic.xml"),
+    ("経済", "business.xml"),
+    ("IT", "it.xml"),
+    ("科学", "science.xml"),
+]
+
+DEFAULT_THRESHOLD = 0.2
+
+# アプリのキャッシュ・計測ログを汚さないよう、logic を import する前に一時ディレクトリへ向ける
+_TMP_DIR = tempfile.mkdtemp(prefix="note-app-bench-")
+os.environ["NOTE_APP_CACHE_DIR"] = _TMP_DIR
+os.environ["NOTE_APP_PERF_LOG"] = ""
+sys.path.insert(0, ROOT_DIR)
+
+
+BENCHMARKS = []
+
+
+class Skip(Exception):
+    """この環境では実行できないベンチマーク"""
+
+
+def benchmark(name, repeat=20, before=None):
+    """ベンチマークを登録する。before() は毎回の計測の直前に（計測外で）呼ばれる"""
+    def decorator(fn):
+        BENCHMARKS.append((name, fn, repeat, before))
+        return fn
+    return decorator
+
+
+def load_fixture(name):
+    with open(os.path.join(FIXTURES_DIR, name), "rb") as f:
+        return f.read()
+
+
+def parse_fixtures():
+    """フィクスチャを解析したニュース一覧（アプリ共通の dict）"""
+    import feedparser
+    from logic.news_fetch import entry_to_news, normalize_entry
+
+    news_list = []
+    for category, name in FIXTURES:
+        for entry in feedparser.parse(load_fixture(name)).entries:
+            news_list.append(entry_to_news(category, normalize_entry(entry)))
+    return news_list
+
+
+@lru_cache(maxsize=None)
+def fixture_news():
+    """計測の対象外で一度だけ解析したフィクスチャ（呼び出し側で変更しないこと）"""
+    return tuple(parse_fixtures())
+
+
+@lru_cache(maxsize=None)
+def synthetic_news(count):
+    """重複判定にかからない count 件のニュース（タイトルと概要の組み合わせを変える）"""
+    base = fixture_news()
+    return tuple(
+        dict(
+            base[i % len(base)],
+            id=f"bench-{i}",
+            summary=base[(i * 7 + i // len(base)) % len(base)]["summary"],
+        )
+        for i in range(count)
+    )
+
+
+# ===== ローカル RSS サーバー =====
+class _QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+_server = None
+
+
+def rss_urls():
+    """フィクスチャを配信するローカルサーバーを起動し、RSS_URLS 形式で返す"""
+    global _server
+    if _server is None:
+        handler = partial(_QuietHandler, directory=FIXTURES_DIR)
+        _server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        threading.Thread(target=_server.serve_forever, daemon=True).start()
+    port = _server.server_address[1]
+    return [(category, f"http://127.0.0.1:{port}/{name}") for category, name in FIXTURES]
+
+
+def clear_feed_cache():
+    from logic.feed_cache import default_cache
+
+    if os.path.isdir(default_cache.cache_dir):
+        for name in os.listdir(default_cache.cache_dir):
+            os.remove(os.path.join(default_cache.cache_dir, name))
+
+
+# ===== RSS =====
+@benchmark("rss.parse")
+def bench_rss_parse():
+    parse_fixtures()
+
+
+@benchmark("news.fetch_cold", repeat=10, before=clear_feed_cache)
+def bench_fetch_cold():
+    from logic.news_fetch import fetch_news
+
+    fetch_news(limit=10, rss_urls=rss_urls())
+
+
+@benchmark("news.fetch_conditional", repeat=20)
+def bench_fetch_conditional():
+    # 2回目以降は 304 Not Modified → キャッシュ済みエントリを使う
+    from logic.news_fetch import fetch_news
+
+    fetch_news(limit=10, rss_urls=rss_urls())
+
+
+@benchmark("news.select")
+def bench_news_select():
+    from logic.news_dedup import collapse_duplicates
+
+    by_category = {}
+    for news in fixture_news():
+        by_category.setdefault(news["category"], []).append(dict(news))
+    collapsed = collapse_duplicates(by_category)
+    {news["id"]: news for news_list in collapsed.values() for news in news_list}
+
+
+@benchmark("news.dedup_400", repeat=10)
+def bench_dedup_400():
+    from logic.news_dedup import find_clusters
+
+    find_clusters(list(synthetic_news(400)))
+
+
+# ===== 記事の解析 =====
+@lru_cache(maxsize=None)
+def large_article():
+    from benchmarks.stub_gemini import make_tagged_article
+
+    return make_tagged_article(400)
+
+
+@benchmark("article.parse_large")
+def bench_parse_large():
+    from logic.article_parser import parse_article
+
+    parse_article(large_article())
+
+
+@benchmark("article.stream_parse")
+def bench_stream_parse():
+    from logic.article_parser import ArticleStreamParser
+
+    text = large_article()
+    parser = ArticleStreamParser()
+    for i in range(0, len(text), 40):
+        parser.feed(text[i:i + 40])
+    parser.close()
+
+
+# ===== プロンプト =====
+def _bench_prompt(count):
+    from logic.prompts import PROMPT_BUILDERS
+
+    news_list = list(synthetic_news(count))
+    for build in PROMPT_BUILDERS.values():
+        build(news_list)
+
+
+for _count in (1, 10, 50):
+    benchmark(f"prompt.build_{_count}")(partial(_bench_prompt, _count))
+
+
+# ===== 画像 =====
+def bench_font_name():
+    from logic.note_image import FONT_PATH
+
+    return os.path.basename(FONT_PATH) if os.path.exists(FONT_PATH) else "pillow-default"
+
+
+def _prepare_font():
+    """フォントファイルが無い環境では Pillow 内蔵のフォントで計測する（meta の font に残る）"""
+    from logic import note_image
+
+    if os.path.exists(note_image.FONT_PATH) or getattr(note_image.load_font, "bench_fallback", False):
+        return
+
+    from PIL import ImageFont
+
+    @lru_cache(maxsize=None)
+    def load_default_font(size, font_path=None):
+        return ImageFont.load_default(size=size)
+
+    load_default_font.bench_fallback = True
+    note_image.load_font = load_default_font
+
+
+@benchmark("image.wrap_title")
+def bench_wrap_title():
+    _prepare_font()
+    from logic.note_image import TITLE_FONT_SIZE, load_font, wrap_title
+
+    font = load_font(TITLE_FONT_SIZE)
+    wrap_title("日銀の追加利上げで住宅ローンと預金金利はどう変わるのか、家計への影響を整理する" * 2, font)
+
+
+@benchmark("image.render_jpeg", repeat=10)
+def bench_render_jpeg():
+    _prepare_font()
+    import io
+    from logic.note_image import render_note_image
+
+    image = render_note_image("日銀の追加利上げで何が変わるのか", date_text="2026.10.17")
+    image.convert("RGB").save(io.BytesIO(), format="JPEG", quality=90)
+
+
+@benchmark("image.export_all", repeat=5)
+def bench_export_all():
+    _prepare_font()
+    import tempfile
+    from logic.note_image import export_images
+
+    with tempfile.TemporaryDirectory() as output_dir:
+        export_images("日銀の追加利上げで何が変わるのか", output_dir=output_dir, date_text="2026.10.17")
+
+
+# ===== Gemini（スタブ） =====
+@benchmark("gemini.stream_stub", repeat=10)
+def bench_gemini_stream():
+    from benchmarks.stub_gemini import StubGeminiClient
+    from logic.article_parser import ArticleStreamParser
+    from logic.gemini import stream_text
+    from logic.gemini_client import GeminiClient
+    from logic.response_cache import cached_stream, default_cache
+
+    client = GeminiClient("stub", rpm=10**9, tpm=10**12, raw_client=StubGeminiClient())
+    parser = ArticleStreamParser()
+    for text in cached_stream(
+        default_cache, "bench", lambda: stream_text(client, "prompt"), force=True
+    ):
+        parser.feed(text)
+    parser.close()
+
+
+# ===== デスクトップアプリの起動 =====
+STARTUP_SCRIPT = """
+import os, sys, time
+start = time.perf_counter()
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+from PySide6.QtWidgets import QApplication
+from ui.main_window import MainWindow
+app = QApplication(sys.argv)
+window = MainWindow()
+window.show()
+app.processEvents()
+print((time.perf_counter() - start) * 1000)
+"""
+
+
+@benchmark("ui.startup", repeat=3)
+def bench_ui_startup():
+    try:
+        import PySide6  # noqa: F401
+    except ImportError:
+        raise Skip("PySide6 がインストールされていません")
+
+    result = subprocess.run(
+        [sys.executable, "-c", STARTUP_SCRIPT],
+        cwd=ROOT_DIR, capture_output=True, text=True,
+        env={**os.environ, "GEMINI_API_KEY": os.environ.get("GEMINI_API_KEY", "bench")},
+    )
+    if result.returncode != 0:
+        raise Skip(f"起動に失敗しました: {result.stderr.strip().splitlines()[-1:]}")
+    # プロセス起動を除いた、import からウィンドウ表示までの時間
+    return float(result.stdout.strip().splitlines()[-1])
+
+
+# ===== 実行・比較 =====
+def run_benchmark(fn, repeat, before):
+    fn()  # ウォームアップ（import・キャッシュの初期化を計測から外す）
+
+    samples = []
+    for _ in range(repeat):
+        if before:
+            before()
+        start = time.perf_counter()
+        reported = fn()
+        elapsed = (time.perf_counter() - start) * 1000
+        samples.append(reported if isinstance(reported, float) else elapsed)
+
+    samples.sort()
+    return {
+        "repeat": repeat,
+        "min_ms": round(samples[0], 3),
+        "median_ms": round(statistics.median(samples), 3),
+        "p95_ms": round(samples[min(len(samples) - 1, round(0.95 * (len(samples) - 1)))], 3),
+        "mean_ms": round(statistics.fmean(samples), 3),
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=ROOT_DIR, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_all(name_filter=None, log=print):
+    results = {}
+    for name, fn, repeat, before in BENCHMARKS:
+        if name_filter and name_filter not in name:
+            continue
+        try:
+            results[name] = run_benchmark(fn, repeat, before)
+            log(f"{name:<26} median {results[name]['median_ms']:>10.3f} ms"
+                f"   p95 {results[name]['p95_ms']:>10.3f} ms")
+        except Skip as e:
+            results[name] = {"skipped": str(e)}
+            log(f"{name:<26} スキップ（{e}）")
+
+    return {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "font": bench_font_name(),
+        },
+        "results": results,
+    }
+
+
+def compare(current, baseline, threshold=DEFAULT_THRESHOLD, log=print):
+    """中央値を比較し、回帰したベンチマーク名のリストを返す"""
+    regressions = []
+    log(f"\n===== 比較（基準: {baseline['meta'].get('commit')} {baseline['meta'].get('timestamp')}） =====")
+    for name, result in current["results"].items():
+        base = baseline["results"].get(name)
+        if not base or "median_ms" not in result or "median_ms" not in base:
+            continue
+        ratio = result["median_ms"] / base["median_ms"] if base["median_ms"] else 1.0
+        mark = ""
+        if ratio > 1 + threshold:
+            regressions.append(name)
+            mark = "  ← 回帰"
+        log(f"{name:<26} {base['median_ms']:>10.3f} → {result['median_ms']:>10.3f} ms"
+            f"  ({ratio:5.2f}x){mark}")
+    return regressions
+
+
+def record_fixtures():
+    """本番の Yahoo!ニュース RSS を取得してフィクスチャを更新する"""
+    from logic.news_fetch import RSS_URLS, get_session
+
+    for (category, url), (_, name) in zip(RSS_URLS, FIXTURES):
+        response = get_session().get(url, timeout=(3.05, 10))
+        response.raise_for_status()
+        with open(os.path.join(FIXTURES_DIR, name), "wb") as f:
+            f.write(response.content)
+        print(f"{category}: {name} を更新しました（{len(response.content):,} バイト）")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="オフラインのベンチマーク")
+    parser.add_argument("-o", "--out", help="結果を保存する JSON ファイル")
+    parser.add_argument("--compare", help="比較する前回の結果（JSON）")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="回帰とみなす遅くなり方（0.2 = 20%%）")
+    parser.add_argument("--filter", help="名前にこの文字列を含むものだけ実行")
+    parser.add_argument("--record", action="store_true", help="本番の RSS でフィクスチャを更新")
+    args = parser.parse_args(argv)
+
+    if args.record:
+        record_fixtures()
+        return 0
+
+    current = run_all(args.filter)
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(current, f, ensure_ascii=False, indent=2)
+        print(f"\n{args.out} に保存しました")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(current, baseline, args.threshold)
+        if regressions:
+            print(f"\n回帰: {', '.join(regressions)}")
+            return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,46 @@
+"""API を呼ばない Gemini クライアント（ベンチマーク用）
+
+genai.Client と同じ client.models.generate_content(_stream) の形で呼べる。
+GeminiClient(raw_client=StubGeminiClient()) とすれば、レート制限・再試行・
+キャッシュを含むアプリ側の処理だけを計測できる。
+"""
+
+import time
+from types import SimpleNamespace
+
+
+def make_tagged_article(paragraphs=40):
+    """Streamlit 用の【TITLE】〜【HASHTAG】形式の長い記事"""
+    body = "日本銀行の追加利上げは家計と企業の双方に影響を与えます。" * 4
+    free = "\n\n".join(f"{i}. {body}" for i in range(paragraphs // 2))
+    paid = "\n\n".join(f"{i}. {body}株価の想定レンジは±3%です。" for i in range(paragraphs))
+    return (
+        "【TITLE】\n日銀の追加利上げで何が変わるのか\n"
+        f"【FREE】\n{free}\n"
+        "【PAYWALL】\n――ここから有料――\n"
+        f"【PAID】\n{paid}\n"
+        "【SNS】\n日銀が追加利上げ。暮らしへの影響を整理しました。\n"
+        "【HASHTAG】\n#日銀 #利上げ #経済ニュース\n"
+    )
+
+
+class _StubModels:
+    def __init__(self, text, chunk_size, delay):
+        self.text = text
+        self.chunk_size = chunk_size
+        self.delay = delay
+
+    def generate_content(self, model, contents, **kwargs):
+        time.sleep(self.delay)
+        return SimpleNamespace(text=self.text)
+
+    def generate_content_stream(self, model, contents, **kwargs):
+        for i in range(0, len(self.text), self.chunk_size):
+            if self.delay:
+                time.sleep(self.delay)
+            yield SimpleNamespace(text=self.text[i:i + self.chunk_size])
+
+
+class StubGeminiClient:
+    def __init__(self, text=None, chunk_size=40, delay=0.0):
+        self.models = _StubModels(text or make_tagged_article(), chunk_size, delay)
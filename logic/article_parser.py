@@ -0,0 +1,127 @@
+"""【TAG】形式で区切られた生成記事の逐次パーサー
+
+ストリーミングで届くテキストを1回の走査で処理し、届いた分から
+各セクションを埋めていく。タグの欠落や順番違いは warnings に記録する。
+"""
+
+from .perf import span
+
+
+# (タグ名, セクションのキー, 必須か)。キーが None のタグは区切りとしてだけ使う
+NOTE_TAGGED_SECTIONS = [
+    ("TITLE", "title", True),
+    ("FREE", "free", True),
+    ("PAYWALL", None, True),
+    ("PAID", "paid", True),
+    ("SNS", "sns", True),
+    ("HASHTAG", "hashtag", True),
+    ("ニュース", None, False),
+]
+
+# NoteTab のプロンプト（【タイトル】〜【有料部分】）用
+NOTE_ARTICLE_SECTIONS = [
+    ("タイトル", "title", True),
+    ("無料公開部分", "free", True),
+    ("ここから有料", None, False),
+    ("有料部分", "paid", True),
+]
+
+
+class ArticleStreamParser:
+    def __init__(self, sections=NOTE_TAGGED_SECTIONS):
+        self.sections = sections
+        self._order = {tag: i for i, (tag, _, _) in enumerate(sections)}
+        self._keys = {tag: key for tag, key, _ in sections}
+        self._parts = {key: [] for _, key, _ in sections if key}
+        self._pending = ""
+        self._last_index = -1
+        self.current_tag = None
+        self.seen_tags = []
+        self.warnings = []
+
+    # ===== 入力 =====
+    def feed(self, text):
+        """テキスト片を追加で処理する"""
+        pending = self._pending + text
+
+        while pending:
+            start = pending.find("【")
+            if start == -1:
+                self._append(pending)
+                pending = ""
+                break
+
+            self._append(pending[:start])
+            pending = pending[start:]
+
+            end = pending.find("】")
+            if end == -1:
+                # タグの途中で切れている可能性があれば次の入力を待つ
+                partial = pending[1:]
+                if any(tag.startswith(partial) for tag in self._order):
+                    break
+                self._append("【")
+                pending = pending[1:]
+                continue
+
+            name = pending[1:end]
+            if name in self._order:
+                self._switch(name)
+                pending = pending[end + 1:]
+            else:
+                # 知らない【…】は本文の一部として扱う
+                self._append("【")
+                pending = pending[1:]
+
+        self._pending = pending
+
+    def close(self):
+        """入力終了。保留中のテキストを確定し、欠落タグを記録する"""
+        if self._pending:
+            self._append(self._pending)
+            self._pending = ""
+
+        for tag in self.missing_tags():
+            self.warnings.append(f"【{tag}】タグがありません")
+        return self.result()
+
+    # ===== 結果 =====
+    def section(self, key):
+        return "".join(self._parts[key]).strip()
+
+    def result(self):
+        return {key: self.section(key) for key in self._parts}
+
+    def current_key(self):
+        return self._keys.get(self.current_tag)
+
+    def missing_tags(self):
+        return [
+            tag for tag, _, required in self.sections
+            if required and tag not in self.seen_tags
+        ]
+
+    # ===== 内部処理 =====
+    def _switch(self, tag):
+        index = self._order[tag]
+        if tag in self.seen_tags:
+            self.warnings.append(f"【{tag}】タグが重複しています")
+        elif index < self._last_index:
+            self.warnings.append(f"【{tag}】タグの順番が正しくありません")
+
+        self.seen_tags.append(tag)
+        self._last_index = max(self._last_index, index)
+        self.current_tag = tag
+
+    def _append(self, text):
+        key = self.current_key()
+        if key and text:
+            self._parts[key].append(text)
+
+
+def parse_article(text, sections=NOTE_TAGGED_SECTIONS):
+    """生成済みの全文を解析して {キー: 本文} を返す"""
+    with span("article.parse", chars=len(text)):
+        parser = ArticleStreamParser(sections)
+        parser.feed(text)
+        return parser.close()
@@ -0,0 +1,187 @@
+"""Google Calendar の予定のローカルキャッシュと差分同期
+
+Calendar API のサービスオブジェクトは1回だけ作って使い回し、予定は
+ディスク上のキャッシュに保存する。2回目以降は syncToken を使って
+前回から変わった予定だけを受け取り、キャッシュに反映する。
+syncToken が失効した場合（410 Gone）は全件を取り直す。
+
+初回の全件同期は SYNC_PAST_DAYS 日前からに絞る。syncToken を使う
+差分同期では timeMin などを指定できないため、表示期間の絞り込みは
+キャッシュから取り出すときに行う。
+"""
+
+import datetime
+import json
+import os
+import threading
+import time
+
+from .perf import span
+from .storage import DEFAULT_CACHE_DIR, write_atomic
+
+
+SCOPES = ["https://www.googleapis.com/auth/calendar.readonly"]
+CREDENTIALS_PATH = "credentials.json"
+TOKEN_PATH = "token.json"
+
+DEFAULT_CACHE_PATH = os.path.join(DEFAULT_CACHE_DIR, "calendar_events.json")
+SYNC_PAST_DAYS = 30
+
+
+def load_credentials():
+    """token.json を再利用し、必要なときだけ更新・ブラウザ認証する"""
+    from google.oauth2.credentials import Credentials
+    from google_auth_oauthlib.flow import InstalledAppFlow
+    from google.auth.transport.requests import Request
+
+    creds = None
+
+    # token.json があれば再利用
+    if os.path.exists(TOKEN_PATH):
+        creds = Credentials.from_authorized_user_file(TOKEN_PATH, SCOPES)
+
+    # 認証が必要な場合
+    if not creds or not creds.valid:
+        if creds and creds.expired and creds.refresh_token:
+            creds.refresh(Request())
+        else:
+            flow = InstalledAppFlow.from_client_secrets_file(CREDENTIALS_PATH, SCOPES)
+            creds = flow.run_local_server(port=0)
+
+        # 認証情報を保存
+        with open(TOKEN_PATH, "w") as token:
+            token.write(creds.to_json())
+
+    return creds
+
+
+def build_service():
+    # Google API クライアントは読み込みが重いので初回同期時に import する
+    from googleapiclient.discovery import build
+
+    return build("calendar", "v3", credentials=load_credentials(), cache_discovery=False)
+
+
+def event_start(event):
+    """予定の開始時刻（終日予定は日付）の文字列"""
+    return event["start"].get("dateTime", event["start"].get("date"))
+
+
+def _parse_time(value):
+    """dateTime / date を比較できる datetime にする（終日予定は UTC の0時）"""
+    text = value.get("dateTime", value.get("date"))
+    if "T" not in text:
+        return datetime.datetime.fromisoformat(text).replace(tzinfo=datetime.timezone.utc)
+    return datetime.datetime.fromisoformat(text.replace("Z", "+00:00"))
+
+
+class CalendarSync:
+    def __init__(self, cache_path=DEFAULT_CACHE_PATH, calendar_id="primary",
+                 service_factory=build_service):
+        self.cache_path = cache_path
+        self.calendar_id = calendar_id
+        self.service_factory = service_factory
+        self._service = None
+        self._lock = threading.Lock()
+        self.sync_token = None
+        self.events = {}          # {予定の ID: 予定}
+        self.load()
+
+    @property
+    def service(self):
+        if self._service is None:
+            self._service = self.service_factory()
+        return self._service
+
+    # ===== キャッシュ =====
+    def load(self):
+        try:
+            with open(self.cache_path, encoding="utf-8") as f:
+                record = json.load(f)
+        except (OSError, ValueError):
+            return
+        if record.get("calendar_id") != self.calendar_id:
+            return
+        self.sync_token = record.get("sync_token")
+        self.events = record.get("events", {})
+
+    def save(self):
+        record = {
+            "calendar_id": self.calendar_id,
+            "sync_token": self.sync_token,
+            "synced_at": time.time(),
+            "events": self.events,
+        }
+        write_atomic(self.cache_path, json.dumps(record, ensure_ascii=False))
+
+    # ===== 同期 =====
+    def _list_pages(self, **params):
+        """全ページの予定と、最後のページの nextSyncToken を返す"""
+        items = []
+        page_token = None
+        while True:
+            result = (
+                self.service.events()
+                .list(calendarId=self.calendar_id, singleEvents=True,
+                      pageToken=page_token, **params)
+                .execute()
+            )
+            items.extend(result.get("items", []))
+            page_token = result.get("nextPageToken")
+            if not page_token:
+                return items, result.get("nextSyncToken")
+
+    def full_sync(self):
+        since = datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(days=SYNC_PAST_DAYS)
+        items, self.sync_token = self._list_pages(timeMin=since.isoformat())
+        self.events = {
+            event["id"]: event for event in items if event.get("status") != "cancelled"
+        }
+        return len(items)
+
+    def incremental_sync(self):
+        """前回からの変更だけを反映し、変更件数を返す"""
+        # syncToken 指定時は削除された予定も status="cancelled" で返る
+        items, self.sync_token = self._list_pages(syncToken=self.sync_token)
+        for event in items:
+            if event.get("status") == "cancelled":
+                self.events.pop(event["id"], None)
+            else:
+                self.events[event["id"]] = event
+        return len(items)
+
+    def sync(self):
+        """差分同期（初回・トークン失効時は全件同期）して変更件数を返す"""
+        from googleapiclient.errors import HttpError
+
+        with self._lock, span("calendar.sync", incremental=bool(self.sync_token)) as s:
+            if self.sync_token:
+                try:
+                    changed = self.incremental_sync()
+                except HttpError as e:
+                    if e.resp.status != 410:
+                        raise
+                    # syncToken の失効：キャッシュを捨てて取り直す
+                    self.sync_token = None
+                    changed = self.full_sync()
+            else:
+                changed = self.full_sync()
+
+            self.save()
+            s["changed"] = changed
+            return changed
+
+    def upcoming(self, days=7, now=None):
+        """キャッシュから今〜days 日後にかかる予定を開始時刻順に返す"""
+        now = now or datetime.datetime.now(datetime.timezone.utc)
+        until = now + datetime.timedelta(days=days)
+        events = []
+        for event in list(self.events.values()):
+            try:
+                start = _parse_time(event["start"])
+                end = _parse_time(event["end"])
+            except (KeyError, ValueError):
+                continue
+            if end > now and start < until:
+                events.append((start, event))
+        return [event for _, event in sorted(events, key=lambda pair: pair[0])]
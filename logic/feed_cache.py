@@ -0,0 +1,62 @@
+"""RSS フィードのディスクキャッシュ（条件付き GET 用）
+
+URL ごとに ETag / Last-Modified と解析済みエントリを JSON で保存する。
+サーバーが 304 を返したときは保存済みエントリをそのまま使い、再解析しない。
+書き込みは logic/storage.py の write_atomic で行う。
+"""
+
+import hashlib
+import json
+import os
+import time
+
+from .storage import DEFAULT_CACHE_DIR, write_atomic
+
+
+class FeedCache:
+    def __init__(self, cache_dir=None):
+        self.cache_dir = os.path.join(cache_dir or DEFAULT_CACHE_DIR, "feeds")
+
+    def _path(self, url):
+        name = hashlib.sha1(url.encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_dir, f"{name}.json")
+
+    def load(self, url):
+        """保存済みのレコードを返す。無い・壊れている場合は None"""
+        try:
+            with open(self._path(url), encoding="utf-8") as f:
+                record = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        if record.get("url") != url:
+            return None
+        return record
+
+    def store(self, url, entries, etag=None, last_modified=None):
+        """エントリと検証子をアトミックに保存"""
+        record = {
+            "url": url,
+            "etag": etag,
+            "last_modified": last_modified,
+            "fetched_at": time.time(),
+            "entries": entries,
+        }
+
+        write_atomic(self._path(url), json.dumps(record, ensure_ascii=False))
+        return record
+
+    @staticmethod
+    def conditional_headers(record):
+        """保存済みレコードから条件付き GET 用のヘッダーを作る"""
+        headers = {}
+        if not record:
+            return headers
+        if record.get("etag"):
+            headers["If-None-Match"] = record["etag"]
+        if record.get("last_modified"):
+            headers["If-Modified-Since"] = record["last_modified"]
+        return headers
+
+
+default_cache = FeedCache()
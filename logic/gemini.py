@@ -0,0 +1,62 @@
+"""Gemini 呼び出しの共通処理"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+from .prompts import PROMPT_BUILDERS
+from .response_cache import cached_stream, default_cache, make_key
+
+
+MODEL_NAME = "gemini-2.5-flash"
+
+
+def stream_text(client, prompt, model=MODEL_NAME):
+    """generate_content_stream の結果をテキスト片ごとに返すジェネレーター
+
+    届いたチャンクから順に yield するので、全文を待たずに表示を始められる。
+    """
+    for chunk in client.models.generate_content_stream(
+        model=model,
+        contents=prompt
+    ):
+        if chunk.text:
+            yield chunk.text
+
+
+# NOTE記事・Xスレッド・動画台本をまとめて作るときの種別
+BUNDLE_KINDS = ("note_article", "x_thread", "video_script")
+
+
+def generate_bundle(client, news_list, kinds=BUNDLE_KINDS, force=False,
+                    on_chunk=None, model=MODEL_NAME):
+    """1つのニュース選択から複数種類の文章を並列に生成する
+
+    各種別は別リクエストだが同時に投げるため、待ち時間はほぼ1往復分になる。
+    on_chunk(kind, text) は生成スレッドから呼ばれる。
+    1つの種別が失敗しても他の結果は捨てず、({種別: 全文}, {種別: 例外}) を返す。
+    """
+    def run(kind):
+        prompt = PROMPT_BUILDERS[kind](news_list)
+        stream = cached_stream(
+            default_cache,
+            make_key(model, kind, news_list, getattr(client, "base_url", None)),
+            lambda: stream_text(client, prompt, model=model),
+            force=force
+        )
+        chunks = []
+        for text in stream:
+            chunks.append(text)
+            if on_chunk:
+                on_chunk(kind, text)
+        return "".join(chunks)
+
+    with ThreadPoolExecutor(max_workers=len(kinds)) as executor:
+        futures = {kind: executor.submit(run, kind) for kind in kinds}
+
+    results = {}
+    errors = {}
+    for kind, future in futures.items():
+        try:
+            results[kind] = future.result()
+        except Exception as e:
+            errors[kind] = e
+    return results, errors
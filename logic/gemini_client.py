@@ -0,0 +1,233 @@
+"""アプリ全体で共有する Gemini クライアント
+
+タブや Streamlit セッションごとに genai.Client を作らず、API キーごとに
+1つのクライアントを共有する。呼び出しは次の順で制御される。
+
+- 同時実行数の上限（セマフォ）
+- リクエスト数 / トークン数のトークンバケット（1分あたり）
+- 429 / 5xx / 通信エラー時のジッター付き指数バックオフ再試行
+- 1回の呼び出し全体の締め切り（deadline）
+
+既存コードと同じく client.models.generate_content(...) /
+client.models.generate_content_stream(...) の形で呼び出せる。
+
+GEMINI_BASE_URL を指定すると接続先を切り替えられる（負荷試験用の
+ローカル代替サーバー benchmarks/mock_gemini.py など）。
+"""
+
+import logging
+import os
+import random
+import threading
+import time
+
+from .perf import record, span
+
+
+logger = logging.getLogger(__name__)
+
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+DEFAULT_RPM = int(os.getenv("GEMINI_RPM", "60"))
+DEFAULT_TPM = int(os.getenv("GEMINI_TPM", "1000000"))
+DEFAULT_MAX_CONCURRENCY = int(os.getenv("GEMINI_MAX_CONCURRENCY", "4"))
+DEFAULT_MAX_RETRIES = 4
+DEFAULT_DEADLINE = 180.0         # 秒（待ち時間・再試行を含む1回の呼び出し全体）
+DEFAULT_REQUEST_TIMEOUT = 120.0  # 秒（HTTP リクエスト1回あたり）
+EXPECTED_OUTPUT_TOKENS = 2000    # 出力トークンの見込み（レート計算用）
+
+
+class DeadlineExceeded(TimeoutError):
+    """締め切りまでに呼び出しが完了しなかった"""
+
+
+def estimate_tokens(text):
+    """プロンプトのおおよそのトークン数
+
+    日本語などの非 ASCII 文字は1文字≒1トークン、英数字は4文字≒1トークンとして
+    見積もる（API の countTokens を呼ぶと1往復増えるため手元で概算する）。
+    """
+    ascii_chars = sum(1 for c in text if c < "\x80")
+    return max(1, len(text) - ascii_chars + (ascii_chars + 3) // 4)
+
+
+class TokenBucket:
+    """1分あたり rate_per_minute まで補充されるトークンバケット"""
+
+    def __init__(self, rate_per_minute):
+        self.capacity = float(rate_per_minute)
+        self.tokens = float(rate_per_minute)
+        self.rate = rate_per_minute / 60.0
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self, amount, deadline):
+        """amount 分のトークンを確保する。deadline（monotonic 秒）を過ぎたら例外"""
+        amount = min(float(amount), self.capacity)
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self._refill(now)
+                if self.tokens >= amount:
+                    self.tokens -= amount
+                    return
+                wait = (amount - self.tokens) / self.rate
+
+            if now + wait > deadline:
+                raise DeadlineExceeded("レート制限の待ち時間が締め切りを超えます")
+            time.sleep(min(wait, 1.0))
+
+
+def is_retryable(error):
+    """再試行すべきエラーか（429・5xx・通信エラー）"""
+    code = getattr(error, "code", None)
+    if isinstance(code, int):
+        return code in RETRYABLE_STATUS
+    return isinstance(error, (ConnectionError, TimeoutError)) or \
+        type(error).__module__.startswith("httpx")
+
+
+def backoff_delay(attempt, base=1.0, cap=30.0):
+    """フルジッター付き指数バックオフ"""
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+class GeminiClient:
+    def __init__(self, api_key, rpm=DEFAULT_RPM, tpm=DEFAULT_TPM,
+                 max_concurrency=DEFAULT_MAX_CONCURRENCY,
+                 max_retries=DEFAULT_MAX_RETRIES, deadline=DEFAULT_DEADLINE,
+                 request_timeout=DEFAULT_REQUEST_TIMEOUT, base_url=None,
+                 raw_client=None):
+        # genai.Client（google.genai の import を含む）は初回呼び出しまで作らない
+        self._raw = raw_client
+        self._raw_lock = threading.Lock()
+        self.api_key = api_key
+        self.base_url = base_url
+        self.request_timeout = request_timeout
+        self.request_limiter = TokenBucket(rpm)
+        self.token_limiter = TokenBucket(tpm)
+        self.semaphore = threading.BoundedSemaphore(max_concurrency)
+        self.max_retries = max_retries
+        self.deadline = deadline
+
+    @property
+    def raw(self):
+        with self._raw_lock:
+            if self._raw is None:
+                from google import genai
+                from google.genai import types
+
+                self._raw = genai.Client(
+                    api_key=self.api_key,
+                    http_options=types.HttpOptions(
+                        timeout=int(self.request_timeout * 1000),
+                        base_url=self.base_url,
+                    )
+                )
+            return self._raw
+
+    # 既存コードの client.models.xxx 呼び出しと互換にする
+    @property
+    def models(self):
+        return self
+
+    def _acquire(self, contents, deadline):
+        tokens = estimate_tokens(str(contents))
+        logger.info("Gemini リクエスト: 入力 約%dトークン", tokens)
+        self.request_limiter.acquire(1, deadline)
+        self.token_limiter.acquire(tokens + EXPECTED_OUTPUT_TOKENS, deadline)
+        if not self.semaphore.acquire(timeout=max(0.0, deadline - time.monotonic())):
+            raise DeadlineExceeded("同時実行数の空き待ちが締め切りを超えました")
+
+    def _sleep_before_retry(self, attempt, deadline, error):
+        if attempt >= self.max_retries or not is_retryable(error):
+            raise error
+        delay = backoff_delay(attempt)
+        if time.monotonic() + delay > deadline:
+            raise error
+        time.sleep(delay)
+
+    def generate_content(self, model, contents, **kwargs):
+        deadline = time.monotonic() + self.deadline
+        attempt = 0
+        with span("gemini.generate", model=model, prompt_chars=len(str(contents))) as s:
+            while True:
+                s["attempts"] = attempt + 1
+                self._acquire(contents, deadline)
+                try:
+                    response = self.raw.models.generate_content(
+                        model=model, contents=contents, **kwargs
+                    )
+                    s["output_chars"] = len(getattr(response, "text", None) or "")
+                    return response
+                except Exception as e:
+                    error = e
+                finally:
+                    self.semaphore.release()
+
+                self._sleep_before_retry(attempt, deadline, error)
+                attempt += 1
+
+    def generate_content_stream(self, model, contents, **kwargs):
+        """ストリーミング生成。最初のチャンクが届く前の失敗だけを再試行する
+
+        途中まで表示した後に再試行すると文章が重複するため、
+        チャンクを1つでも返した後のエラーはそのまま呼び出し元に伝える。
+        """
+        deadline = time.monotonic() + self.deadline
+        attempt = 0
+        start = time.perf_counter()
+        with span("gemini.stream", model=model, prompt_chars=len(str(contents))) as s:
+            s["output_chars"] = 0
+            while True:
+                s["attempts"] = attempt + 1
+                self._acquire(contents, deadline)
+                started = False
+                try:
+                    for chunk in self.raw.models.generate_content_stream(
+                        model=model, contents=contents, **kwargs
+                    ):
+                        if not started:
+                            started = True
+                            record("gemini.first_chunk", (time.perf_counter() - start) * 1000, model=model)
+                        s["output_chars"] += len(getattr(chunk, "text", None) or "")
+                        yield chunk
+                    return
+                except Exception as e:
+                    if started:
+                        raise
+                    error = e
+                finally:
+                    self.semaphore.release()
+
+                self._sleep_before_retry(attempt, deadline, error)
+                attempt += 1
+
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def get_client(api_key=None, base_url=None):
+    """API キー・接続先ごとに共有クライアントを返す
+
+    未指定の項目は .env / 環境変数（GEMINI_API_KEY, GEMINI_BASE_URL）から読む。
+    """
+    if api_key is None:
+        from dotenv import load_dotenv
+
+        load_dotenv()
+        api_key = os.getenv("GEMINI_API_KEY")
+    if base_url is None:
+        base_url = os.getenv("GEMINI_BASE_URL") or None
+
+    with _clients_lock:
+        client = _clients.get((api_key, base_url))
+        if client is None:
+            client = GeminiClient(api_key, base_url=base_url)
+            _clients[api_key, base_url] = client
+        return client
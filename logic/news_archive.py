@@ -0,0 +1,178 @@
+"""取得したニュースの永続アーカイブ（SQLite FTS5）
+
+RSS で取得したエントリを GUID / リンクのハッシュを ID として日をまたいで蓄積し、
+キーワード・カテゴリ・日付で検索できるようにする。
+日本語は単語区切りが無いため FTS5 の trigram トークナイザーを使う
+（2文字以下のキーワードは LIKE 検索にフォールバック）。
+キーワードは空白で区切ると、すべての語を含むものを探す（AND 検索）。
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+
+from .perf import span
+from .storage import DEFAULT_CACHE_DIR
+
+
+DEFAULT_DB_PATH = os.path.join(DEFAULT_CACHE_DIR, "news_archive.sqlite3")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS news (
+    rowid INTEGER PRIMARY KEY,
+    id TEXT NOT NULL UNIQUE,
+    category TEXT NOT NULL,
+    title TEXT NOT NULL,
+    summary TEXT NOT NULL,
+    link TEXT NOT NULL,
+    published TEXT NOT NULL,
+    first_seen REAL NOT NULL,
+    last_seen REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS news_category_seen ON news (category, first_seen);
+CREATE INDEX IF NOT EXISTS news_first_seen ON news (first_seen);
+
+CREATE VIRTUAL TABLE IF NOT EXISTS news_fts USING fts5(
+    title, summary,
+    content='news', content_rowid='rowid',
+    tokenize='trigram'
+);
+
+CREATE TRIGGER IF NOT EXISTS news_ai AFTER INSERT ON news BEGIN
+    INSERT INTO news_fts (rowid, title, summary)
+    VALUES (new.rowid, new.title, new.summary);
+END;
+"""
+
+COLUMNS = ("id", "category", "title", "summary", "link", "published", "first_seen")
+
+
+def news_id(guid=None, link=None, category="", title=""):
+    """エントリの安定した ID（GUID → リンク → カテゴリ＋タイトルの順で使う）"""
+    source = guid or link or f"{category}\n{title}"
+    return hashlib.sha1(source.encode("utf-8")).hexdigest()[:16]
+
+
+def _to_timestamp(value, end_of_day=False):
+    """date / datetime / タイムスタンプを UNIX 秒に揃える"""
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    if not isinstance(value, datetime):
+        value = datetime.combine(value, datetime.max.time() if end_of_day else datetime.min.time())
+    return value.timestamp()
+
+
+def _fts_phrase(term):
+    """FTS5 のフレーズ（" で囲み、中の " は重ねる）"""
+    return '"' + term.replace('"', '""') + '"'
+
+
+def _escape_like(term):
+    """LIKE の特殊文字（% と _）をそのままの文字として探せるようにする"""
+    return term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+class NewsArchive:
+    def __init__(self, path=DEFAULT_DB_PATH):
+        self.path = path
+        self._init_lock = threading.Lock()
+        self._initialized = False
+
+    def _connect(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=10)
+        conn.row_factory = sqlite3.Row
+        with self._init_lock:
+            if not self._initialized:
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.executescript(SCHEMA)
+                self._initialized = True
+        return conn
+
+    def store(self, news_list):
+        """ニュースを追加する。既存の ID は最終確認時刻だけ更新する"""
+        if not news_list:
+            return
+        now = time.time()
+
+        conn = self._connect()
+        try:
+            with span("archive.store", items=len(news_list)), conn:
+                conn.executemany(
+                    """
+                    INSERT INTO news
+                        (id, category, title, summary, link, published, first_seen, last_seen)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                    ON CONFLICT(id) DO UPDATE SET last_seen = excluded.last_seen
+                    """,
+                    [
+                        (
+                            news["id"], news["category"], news["title"],
+                            news.get("summary", ""), news.get("link", ""),
+                            news.get("published", ""), now, now,
+                        )
+                        for news in news_list
+                    ]
+                )
+        finally:
+            conn.close()
+
+    def search(self, keyword="", category=None, since=None, until=None, limit=50):
+        """キーワード・カテゴリ・期間（取得日）で検索し、新しい順に返す"""
+        where = []
+        params = []
+
+        keyword = keyword.strip()
+        terms = keyword.split()
+        fts_terms = [term for term in terms if len(term) >= 3]
+        if fts_terms:
+            # 語ごとにフレーズとして囲み、空白区切りで並べると FTS5 では AND になる
+            where.append("news.rowid IN (SELECT rowid FROM news_fts WHERE news_fts MATCH ?)")
+            params.append(" ".join(_fts_phrase(term) for term in fts_terms))
+        for term in terms:
+            if len(term) < 3:
+                where.append(
+                    "(news.title LIKE ? ESCAPE '\\' OR news.summary LIKE ? ESCAPE '\\')"
+                )
+                pattern = f"%{_escape_like(term)}%"
+                params += [pattern, pattern]
+
+        if category:
+            where.append("news.category = ?")
+            params.append(category)
+        if since is not None:
+            where.append("news.first_seen >= ?")
+            params.append(_to_timestamp(since))
+        if until is not None:
+            where.append("news.first_seen <= ?")
+            params.append(_to_timestamp(until, end_of_day=True))
+
+        sql = f"SELECT {', '.join(COLUMNS)} FROM news"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY news.first_seen DESC LIMIT ?"
+        params.append(limit)
+
+        conn = self._connect()
+        try:
+            with span("archive.search", keyword=keyword) as s:
+                rows = [dict(row) for row in conn.execute(sql, params)]
+                s["results"] = len(rows)
+            return rows
+        finally:
+            conn.close()
+
+    def categories(self):
+        conn = self._connect()
+        try:
+            return [row[0] for row in conn.execute("SELECT DISTINCT category FROM news ORDER BY category")]
+        finally:
+            conn.close()
+
+
+default_archive = NewsArchive()
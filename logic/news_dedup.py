@@ -0,0 +1,138 @@
+"""ほぼ同じニュースの検出（文字 n-gram のシングリング）
+
+同じ記事が「国内」と「経済」など複数カテゴリに載ることがあり、
+両方を選ぶとプロンプトに同じ内容が重複してトークンと待ち時間が増える。
+日本語は単語区切りが無いため、形態素解析を使わず文字 3-gram の集合
+（シングル）の Jaccard 係数で比較する。
+
+一度に扱うのは数百件程度なので MinHash の近似は使わず、
+n-gram → ニュースの転置インデックスで共通 n-gram の数を数えて
+共通部分のあるペアだけ正確な係数を求める。
+"""
+
+import re
+import unicodedata
+
+
+SHINGLE_SIZE = 3
+DEFAULT_THRESHOLD = 0.5        # Jaccard 係数がこれ以上なら同じニュース
+
+_IGNORED = re.compile(r"[\s\W_]+")
+
+
+def normalize_text(text):
+    """全角半角・大文字小文字・空白記号の違いを吸収する"""
+    text = unicodedata.normalize("NFKC", text or "").lower()
+    return _IGNORED.sub("", text)
+
+
+def shingles(text, size=SHINGLE_SIZE):
+    """文字 n-gram の集合（短すぎる文は全体を1つの要素にする）"""
+    text = normalize_text(text)
+    if len(text) <= size:
+        return {text} if text else set()
+    return {text[i:i + size] for i in range(len(text) - size + 1)}
+
+
+def news_shingles(news):
+    return shingles(f"{news.get('title', '')}{news.get('summary', '')}")
+
+
+def find_clusters(news_list, threshold=DEFAULT_THRESHOLD):
+    """ほぼ同じニュースの index をまとめたクラスタのリストを返す
+
+    各クラスタは元の順番で並び、先頭が代表になる。重複の無いニュースは
+    要素1つのクラスタになる。
+    """
+    sets = [news_shingles(news) for news in news_list]
+    parent = list(range(len(news_list)))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    # 転置インデックスでペアごとの共通 n-gram 数を数える
+    index = {}
+    for i, shingle_set in enumerate(sets):
+        for shingle in shingle_set:
+            index.setdefault(shingle, []).append(i)
+
+    shared = {}
+    for members in index.values():
+        for pos, i in enumerate(members):
+            for j in members[pos + 1:]:
+                shared[i, j] = shared.get((i, j), 0) + 1
+
+    for (i, j), common in shared.items():
+        # |A∩B| / |A∪B| = common / (|A| + |B| - common)
+        if common / (len(sets[i]) + len(sets[j]) - common) >= threshold:
+            root_i, root_j = find(i), find(j)
+            if root_i != root_j:
+                # 先に出てきた方を代表にする
+                parent[max(root_i, root_j)] = min(root_i, root_j)
+
+    clusters = {}
+    for i in range(len(news_list)):
+        clusters.setdefault(find(i), []).append(i)
+    return sorted(clusters.values(), key=lambda members: members[0])
+
+
+def merge_news(group):
+    """同じニュースのグループを1件にまとめる（カテゴリは併記、概要は一番長いもの）"""
+    first = group[0]
+    if len(group) == 1:
+        return first
+
+    categories = []
+    for news in group:
+        for category in [news.get("category", "")] + news.get("also_in", []):
+            if category and category not in categories:
+                categories.append(category)
+
+    merged = dict(first)
+    merged["category"] = "・".join(categories)
+    merged["summary"] = max((news.get("summary", "") for news in group), key=len)
+    return merged
+
+
+def merge_duplicates(news_list, threshold=DEFAULT_THRESHOLD):
+    """選択ニュースのうち、ほぼ同じものを1件にまとめたリストを返す"""
+    if len(news_list) < 2:
+        return list(news_list)
+    return [
+        merge_news([news_list[i] for i in members])
+        for members in find_clusters(news_list, threshold)
+    ]
+
+
+def collapse_duplicates(news_by_category, threshold=DEFAULT_THRESHOLD):
+    """カテゴリをまたいだ重複を、最初に出てきたカテゴリの1件だけ残して取り除く
+
+    残したニュースには重複していた他のカテゴリを "also_in" として付ける。
+    """
+    flat = [
+        (category, news)
+        for category, news_list in news_by_category.items()
+        for news in news_list
+    ]
+    drop = set()
+    for members in find_clusters([news for _, news in flat], threshold):
+        if len(members) == 1:
+            continue
+        representative = flat[members[0]][1]
+        also_in = []
+        for i in members[1:]:
+            drop.add(i)
+            category = flat[i][0]
+            if category != flat[members[0]][0] and category not in also_in:
+                also_in.append(category)
+        if also_in:
+            representative["also_in"] = also_in
+
+    collapsed = {category: [] for category in news_by_category}
+    for i, (category, news) in enumerate(flat):
+        if i not in drop:
+            collapsed[category].append(news)
+    return collapsed
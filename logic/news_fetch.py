@@ -0,0 +1,185 @@
+"""Yahoo!ニュース RSS の取得
+
+全カテゴリのフィードを keep-alive の接続プールで並列に取得する。
+待ち時間は「全フィードの合計」ではなく「一番遅いフィード」で決まる。
+ETag / Last-Modified による条件付き GET を行い、304 の場合は
+ディスクキャッシュ（logic/feed_cache.py）の解析済みエントリを再利用する。
+"""
+
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import feedparser
+import requests
+from requests.adapters import HTTPAdapter
+
+from .feed_cache import default_cache
+from .news_archive import default_archive, news_id
+from .news_dedup import collapse_duplicates
+from .perf import span
+
+
+logger = logging.getLogger(__name__)
+
+RSS_URLS = [
+    ("国内", "https://news.yahoo.co.jp/rss/topics/domestic.xml"),
+    ("経済", "https://news.yahoo.co.jp/rss/topics/business.xml"),
+    ("IT", "https://news.yahoo.co.jp/rss/topics/it.xml"),
+    ("科学", "https://news.yahoo.co.jp/rss/topics/science.xml"),
+]
+
+# (接続タイムアウト, 読み込みタイムアウト) 秒。フィードごとに適用される
+DEFAULT_TIMEOUT = (3.05, 5)
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session():
+    """プロセス内で共有する keep-alive セッションを返す"""
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=len(RSS_URLS) * 2)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            session.headers["User-Agent"] = "streamlit-note-app/1.0 (+feedparser)"
+            _session = session
+        return _session
+
+
+def normalize_entry(entry):
+    """feedparser のエントリから必要な項目だけを取り出す（キャッシュ保存用）"""
+    return {
+        "id": entry.get("id") or entry.get("link", ""),
+        "title": entry.get("title", ""),
+        "summary": entry.get("summary"),
+        "description": entry.get("description"),
+        "link": entry.get("link", ""),
+        "published": entry.get("published", ""),
+    }
+
+
+def entry_to_news(category, entry):
+    """正規化済みエントリをアプリ共通の dict に変換"""
+    summary = entry.get("summary")
+    if summary is None:
+        summary = entry.get("description") or "（概要なし）"
+
+    return {
+        "id": news_id(entry.get("id"), entry.get("link"), category, entry["title"]),
+        "category": category,
+        "title": entry["title"],
+        "summary": summary,
+        "link": entry.get("link", ""),
+        "published": entry.get("published", ""),
+    }
+
+
+def fetch_feed(url, timeout=DEFAULT_TIMEOUT, cache=default_cache):
+    """1本のフィードを取得して正規化済みエントリ一覧を返す
+
+    304 Not Modified の場合はキャッシュ済みエントリを返し、解析をスキップする。
+    通信に失敗してもキャッシュがあれば古いエントリを返す。
+    """
+    record = cache.load(url)
+
+    with span("rss.fetch", url=url) as s:
+        try:
+            response = get_session().get(
+                url,
+                headers=cache.conditional_headers(record),
+                timeout=timeout
+            )
+            s["status"] = response.status_code
+            s["bytes"] = len(response.content)
+            if response.status_code == 304 and record:
+                return record["entries"]
+            response.raise_for_status()
+        except requests.RequestException:
+            if record:
+                logger.warning("RSS取得に失敗したためキャッシュを使用: %s", url)
+                s["status"] = "cache"
+                return record["entries"]
+            raise
+
+    with span("rss.parse", url=url, bytes=len(response.content)) as s:
+        entries = [
+            normalize_entry(entry)
+            for entry in feedparser.parse(response.content).entries
+        ]
+        s["entries"] = len(entries)
+    cache.store(
+        url,
+        entries,
+        etag=response.headers.get("ETag"),
+        last_modified=response.headers.get("Last-Modified"),
+    )
+    return entries
+
+
+def fetch_news(limit=5, rss_urls=RSS_URLS, timeout=DEFAULT_TIMEOUT,
+               archive=default_archive):
+    """全カテゴリを並列取得して {カテゴリ: [ニュース, ...]} を返す
+
+    取得に失敗したカテゴリは空リストになり、他のカテゴリの結果は返る。
+    返り値のカテゴリ順は rss_urls の順番のまま。
+    取得したエントリは（limit に関係なく）すべてアーカイブに保存する。
+    カテゴリをまたいだほぼ同じニュースは最初のカテゴリの1件にまとめてから
+    limit 件に絞る（logic/news_dedup.py）。
+    """
+    results = {category: [] for category, _ in rss_urls}
+
+    with span("rss.fetch_all", feeds=len(rss_urls)), \
+            ThreadPoolExecutor(max_workers=len(rss_urls) or 1) as executor:
+        futures = {
+            category: executor.submit(fetch_feed, url, timeout)
+            for category, url in rss_urls
+        }
+
+        for category, future in futures.items():
+            try:
+                entries = future.result()
+            except Exception as e:
+                logger.warning("RSS取得エラー [%s]: %s", category, e)
+                continue
+
+            news_list = [entry_to_news(category, entry) for entry in entries]
+            if archive is not None:
+                try:
+                    archive.store(news_list)
+                except Exception as e:
+                    logger.warning("アーカイブ保存エラー [%s]: %s", category, e)
+            results[category] = news_list
+
+    return _collapse_and_limit(results, limit)
+
+
+def cached_news(limit=5, rss_urls=RSS_URLS, cache=default_cache):
+    """通信せずにディスクキャッシュだけから fetch_news と同じ形の結果を作る
+
+    キャッシュが1件も無ければ None（起動直後に最初の表示を待たせないため）。
+    """
+    results = {}
+    found = False
+    for category, url in rss_urls:
+        record = cache.load(url)
+        entries = record["entries"] if record else []
+        found = found or record is not None
+        results[category] = [entry_to_news(category, entry) for entry in entries]
+
+    if not found:
+        return None
+    return _collapse_and_limit(results, limit)
+
+
+def _collapse_and_limit(results, limit):
+    with span("news.dedup", items=sum(len(v) for v in results.values())):
+        collapsed = collapse_duplicates(results)
+
+    return {
+        category: news_list[:limit]
+        for category, news_list in collapsed.items()
+    }
@@ -0,0 +1,164 @@
+"""ニュースのバックグラウンド更新（stale-while-revalidate）
+
+専用スレッドが一定間隔で全フィードを取り直し、出来上がったスナップショットを
+参照の差し替え1回で入れ替える。表示側は latest() で今あるスナップショットを
+すぐに受け取るので、多少古くてもページの表示が通信を待つことはない。
+
+    refresher.start()
+    snapshot = refresher.latest()
+    snapshot.items        # 全カテゴリのニュースを並べたタプル
+    snapshot.age()        # 取得してからの秒数
+
+起動直後はディスクキャッシュ（logic/feed_cache.py）から最初のスナップショットを作る。
+キャッシュも無い初回だけは最初の取得が終わるまで待つ。
+"""
+
+import logging
+import os
+import threading
+import time
+
+from .news_fetch import cached_news, fetch_news
+from .perf import span
+
+
+logger = logging.getLogger(__name__)
+
+REFRESH_INTERVAL = float(os.getenv("NEWS_REFRESH_INTERVAL", "600"))   # 秒
+RETRY_INTERVAL = 60.0          # 取得に失敗したときに次に試すまでの秒数
+
+
+class NewsSnapshot:
+    """ある時点のニュース一覧（作成後は変更しない）"""
+
+    def __init__(self, by_category, fetched_at, source):
+        self.by_category = {
+            category: tuple(news_list)
+            for category, news_list in by_category.items()
+        }
+        self.items = tuple(
+            news
+            for news_list in self.by_category.values()
+            for news in news_list
+        )
+        self.fetched_at = fetched_at
+        self.source = source       # "network" / "cache"
+
+    def age(self):
+        return time.time() - self.fetched_at
+
+
+class NewsRefresher:
+    def __init__(self, interval=REFRESH_INTERVAL, limit=5,
+                 fetch=fetch_news, load_cached=cached_news):
+        self.interval = interval
+        self.limit = limit
+        self._fetch = fetch
+        self._load_cached = load_cached
+        self._snapshot = None
+        self._ready = threading.Event()      # 最初のスナップショットができた
+        self._wakeup = threading.Event()     # refresh_now() で待ちを打ち切る
+        self._thread = None
+        self._start_lock = threading.Lock()
+        self._listeners = []
+
+    def add_listener(self, callback):
+        """スナップショットを差し替えるたびに callback(snapshot) を呼ぶ（更新スレッド上）"""
+        self._listeners.append(callback)
+
+    def start(self):
+        """更新スレッドを起動する（何度呼んでもよい）"""
+        with self._start_lock:
+            if self._thread is not None:
+                return
+            if self._snapshot is None:
+                self._load_from_cache()
+            self._thread = threading.Thread(
+                target=self._run, name="news-refresher", daemon=True
+            )
+            self._thread.start()
+
+    def refresh_now(self):
+        """次の更新を待たずにすぐ取り直す（結果は待たない）"""
+        self._wakeup.set()
+
+    def latest(self, timeout=None):
+        """今あるスナップショットを返す
+
+        まだ1つも無いとき（キャッシュの無い初回）だけ最初の取得を待つ。
+        timeout 秒待っても無ければ None。
+        """
+        snapshot = self._snapshot
+        if snapshot is not None:
+            return snapshot
+        self.start()
+        self._ready.wait(timeout)
+        return self._snapshot
+
+    # ===== 更新スレッド =====
+    def _load_from_cache(self):
+        try:
+            by_category = self._load_cached(limit=self.limit)
+        except Exception as e:
+            logger.warning("キャッシュからのニュース読み込みに失敗: %s", e)
+            return
+        if by_category is not None:
+            # 古い可能性があるので、更新スレッドは source を見てすぐに取り直す
+            self._swap(NewsSnapshot(by_category, time.time(), "cache"))
+
+    def _run(self):
+        while True:
+            wait = self.interval
+            snapshot = self._snapshot
+            # キャッシュから作ったものや空の一覧（初回の取得に失敗した）は古いものと同じに扱う
+            stale = (
+                snapshot is None
+                or snapshot.source == "cache"
+                or not snapshot.items
+                or snapshot.age() >= self.interval
+            )
+            if stale:
+                if not self._refresh():
+                    wait = min(RETRY_INTERVAL, self.interval)
+            else:
+                wait = self.interval - snapshot.age()
+
+            self._wakeup.wait(wait)
+            if self._wakeup.is_set():
+                self._wakeup.clear()
+                self._refresh()
+
+    def _refresh(self):
+        """取り直して差し替える。使えるニュースが取れなかったら古いものを残して False"""
+        try:
+            with span("news.refresh") as s:
+                by_category = self._fetch(limit=self.limit)
+                s["items"] = sum(len(v) for v in by_category.values())
+        except Exception as e:
+            logger.warning("ニュースの更新に失敗: %s", e)
+            if self._snapshot is None:
+                # 初回の待ちを終わらせるため空の一覧を入れておく
+                self._swap(NewsSnapshot({}, time.time(), "network"))
+            return False
+
+        if not any(by_category.values()):
+            # 全フィードが失敗した：空の一覧で置き換えず、RETRY_INTERVAL 後に再試行する
+            logger.warning("ニュースを1件も取得できませんでした")
+            if self._snapshot is None:
+                self._swap(NewsSnapshot(by_category, time.time(), "network"))
+            return False
+
+        self._swap(NewsSnapshot(by_category, time.time(), "network"))
+        return True
+
+    def _swap(self, snapshot):
+        self._snapshot = snapshot
+        self._ready.set()
+        for callback in list(self._listeners):
+            try:
+                callback(snapshot)
+            except Exception as e:
+                logger.warning("ニュース更新後の処理に失敗: %s", e)
+
+
+default_refresher = NewsRefresher()
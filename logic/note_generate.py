@@ -0,0 +1,177 @@
+"""GUI なしでまとめて記事を生成するバッチ処理
+
+ニュース N 件それぞれについて NOTE 記事・X スレッド・動画台本・見出し画像を作り、
+出力ディレクトリに書き出す。cron などから定期実行できる。
+
+    python -m logic.note_generate --out output/today --items 5 --workers 3
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from .article_parser import NOTE_ARTICLE_SECTIONS, parse_article
+from .gemini import BUNDLE_KINDS, generate_bundle
+from .gemini_client import get_client
+from .news_fetch import fetch_news
+from .note_image import save_note_image
+
+
+DEFAULT_WORKERS = 3
+
+
+def load_news_items(news_file=None, items=5, categories=None):
+    """JSON ファイルまたは RSS からニュースを読み込み、先頭 items 件を返す
+
+    RSS の場合はカテゴリ順に並べたうえで先頭から取る。
+    """
+    if news_file:
+        with open(news_file, encoding="utf-8") as f:
+            news_list = json.load(f)
+    else:
+        news_list = []
+        for category, entries in fetch_news(limit=items).items():
+            if categories and category not in categories:
+                continue
+            news_list.extend(entries)
+
+    return news_list[:items]
+
+
+def item_dir_name(index, news):
+    digest = hashlib.sha1(
+        (news.get("link") or news["title"]).encode("utf-8")
+    ).hexdigest()[:8]
+    return f"{index:02d}_{digest}"
+
+
+def write_text(path, text):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+
+
+def process_item(client, index, news, out_dir, kinds=BUNDLE_KINDS,
+                 with_image=True, force=False):
+    """1件分の生成と書き出し。結果の概要を dict で返す
+
+    失敗した種別は errors に残し、成功した種別のファイルは書き出す。
+    """
+    item_dir = os.path.join(out_dir, item_dir_name(index, news))
+    os.makedirs(item_dir, exist_ok=True)
+    write_text(
+        os.path.join(item_dir, "news.json"),
+        json.dumps(news, ensure_ascii=False, indent=2)
+    )
+
+    results, errors = generate_bundle(client, [news], kinds=kinds, force=force)
+    if not results:
+        # 全種別が失敗したときだけ、この1件を失敗にする
+        raise next(iter(errors.values()))
+
+    files = []
+    for kind, text in results.items():
+        path = os.path.join(item_dir, f"{kind}.txt")
+        write_text(path, text)
+        files.append(path)
+
+    entry = {"title": news["title"], "dir": item_dir, "files": files}
+    if errors:
+        entry["errors"] = {kind: str(e) for kind, e in errors.items()}
+
+    if with_image:
+        title = ""
+        if "note_article" in results:
+            title = parse_article(results["note_article"], NOTE_ARTICLE_SECTIONS)["title"]
+        # 画像だけ失敗しても、書き出し済みの文章は成功として残す
+        try:
+            files.append(
+                save_note_image(title or news["title"], os.path.join(item_dir, "header.jpg"))
+            )
+        except Exception as e:
+            entry["image_error"] = str(e)
+
+    return entry
+
+
+def run_batch(client, news_list, out_dir, workers=DEFAULT_WORKERS,
+              kinds=BUNDLE_KINDS, with_image=True, force=False, log=print):
+    """ニュース一覧を最大 workers 件ずつ並列に処理して manifest を返す"""
+    os.makedirs(out_dir, exist_ok=True)
+    manifest = {
+        "started_at": datetime.now().isoformat(timespec="seconds"),
+        "items": [],
+    }
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(
+                process_item, client, index, news, out_dir,
+                kinds, with_image, force
+            )
+            for index, news in enumerate(news_list, start=1)
+        ]
+
+        for news, future in zip(news_list, futures):
+            try:
+                entry = future.result()
+                entry["status"] = "ok"
+                failed = [f"{kind}: {error}" for kind, error in entry.get("errors", {}).items()]
+                if "image_error" in entry:
+                    failed.append(f"画像: {entry['image_error']}")
+                if failed:
+                    log(f"[OK] {news['title']}（一部失敗: {' / '.join(failed)}）")
+                else:
+                    log(f"[OK] {news['title']}")
+            except Exception as e:
+                entry = {"title": news["title"], "status": "error", "error": str(e)}
+                log(f"[NG] {news['title']}: {e}")
+            manifest["items"].append(entry)
+
+    manifest["finished_at"] = datetime.now().isoformat(timespec="seconds")
+    write_text(
+        os.path.join(out_dir, "manifest.json"),
+        json.dumps(manifest, ensure_ascii=False, indent=2)
+    )
+    return manifest
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="NOTE記事・X投稿・台本・画像の一括生成")
+    parser.add_argument(
+        "--out",
+        default=os.path.join("output", datetime.now().strftime("%Y%m%d")),
+        help="出力ディレクトリ"
+    )
+    parser.add_argument("--items", type=int, default=5, help="処理するニュース件数")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="同時に処理する件数")
+    parser.add_argument("--news-file", help="RSS の代わりに使うニュース一覧（JSON）")
+    parser.add_argument("--category", action="append", dest="categories", help="対象カテゴリ（複数指定可）")
+    parser.add_argument("--kind", action="append", dest="kinds", choices=BUNDLE_KINDS, help="生成する種類（複数指定可）")
+    parser.add_argument("--no-image", action="store_true", help="見出し画像を作らない")
+    parser.add_argument("--force", action="store_true", help="生成結果キャッシュを使わない")
+    args = parser.parse_args(argv)
+
+    news_list = load_news_items(args.news_file, args.items, args.categories)
+    if not news_list:
+        print("処理対象のニュースがありません。", file=sys.stderr)
+        return 1
+
+    manifest = run_batch(
+        get_client(), news_list, args.out,
+        workers=max(1, args.workers),
+        kinds=tuple(args.kinds or BUNDLE_KINDS),
+        with_image=not args.no_image,
+        force=args.force,
+    )
+
+    failed = [item for item in manifest["items"] if item["status"] != "ok"]
+    print(f"完了：{len(manifest['items']) - len(failed)}件成功 / {len(failed)}件失敗 → {args.out}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,255 @@
+"""NOTE 見出し画像のレンダラー
+
+デコード済みのベース画像とフォントはメモリに保持して使い回す。
+タイトルの折り返しは1文字ごとの送り幅を一度だけ測ってキャッシュし、
+文字数に比例する時間で行う（毎回 textbbox で先頭から測り直さない）。
+
+export_images() はベース画像への描画を1回だけ行い、その画像から
+NOTE 見出し・X カード・YouTube サムネイル・プレビューの各サイズと形式
+（JPEG / WebP / PNG）を並列に書き出す。
+"""
+
+import io
+import logging
+import os
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from functools import lru_cache
+
+from PIL import Image, ImageDraw, ImageFont, ImageOps
+
+from .perf import span, timed
+from .storage import write_atomic
+
+
+logger = logging.getLogger(__name__)
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ASSETS_DIR = os.path.join(BASE_DIR, "assets")
+FONT_PATH = os.path.join(ASSETS_DIR, "fonts", "NotoSansJP-Regular.ttf")
+
+TITLE_FONT_SIZE = 48
+DATE_FONT_SIZE = 28
+TITLE_MAX_WIDTH = 900
+TITLE_POSITION = (100, 300)
+LINE_HEIGHT = 60  # 行間（調整可）
+
+
+def detect_background_category(title: str) -> str:
+    if any(word in title for word in ["AI", "IT", "テクノロジー", "半導体"]):
+        return "it"
+    if any(word in title for word in ["株", "経済", "金融", "円", "インフレ"]):
+        return "economy"
+    if any(word in title for word in ["政府", "政策", "法案", "選挙"]):
+        return "policy"
+    if any(word in title for word in ["研究", "科学", "実験", "宇宙"]):
+        return "science"
+    return "default"
+
+
+# ===== キャッシュ =====
+@lru_cache(maxsize=None)
+def load_font(size, font_path=FONT_PATH):
+    return ImageFont.truetype(font_path, size)
+
+
+@lru_cache(maxsize=None)
+def load_base_image(category):
+    """カテゴリのベース画像をデコードして返す（呼び出し側は copy() して使う）"""
+    base_path = os.path.join(ASSETS_DIR, f"note_base_{category}.jpg")
+    if not os.path.exists(base_path):
+        base_path = os.path.join(ASSETS_DIR, "note_base_default.jpg")
+
+    with Image.open(base_path) as image:
+        return image.convert("RGB")
+
+
+_advance_cache = {}
+_advance_lock = threading.Lock()
+
+
+def char_advance(font, char):
+    """1文字の送り幅（フォントごとにキャッシュ）"""
+    widths = _advance_cache.get(id(font))
+    if widths is None:
+        with _advance_lock:
+            widths = _advance_cache.setdefault(id(font), {})
+
+    width = widths.get(char)
+    if width is None:
+        width = font.getlength(char)
+        widths[char] = width
+    return width
+
+
+# ===== 折り返し =====
+def wrap_title(title, font, max_width=TITLE_MAX_WIDTH):
+    """文字単位で max_width に収まるように折り返す（O(文字数)）"""
+    lines = []
+    current = []
+    width = 0.0
+
+    for char in title:
+        advance = char_advance(font, char)
+        if current and width + advance > max_width:
+            lines.append("".join(current))
+            current = []
+            width = 0.0
+        current.append(char)
+        width += advance
+
+    if current:
+        lines.append("".join(current))
+    return lines
+
+
+# ===== 描画 =====
+@timed("image.render")
+def render_note_image(title, date_text=None, category=None):
+    """タイトルと日付を描いた画像（PIL.Image）を返す"""
+    if category is None:
+        category = detect_background_category(title)
+    if date_text is None:
+        date_text = datetime.now().strftime("%Y.%m.%d")
+
+    image = load_base_image(category).copy()
+    draw = ImageDraw.Draw(image)
+
+    title_font = load_font(TITLE_FONT_SIZE)
+    date_font = load_font(DATE_FONT_SIZE)
+
+    x, y = TITLE_POSITION
+    for line in wrap_title(title, title_font):
+        draw.text((x, y), line, font=title_font, fill="white")
+        y += LINE_HEIGHT
+
+    draw.text((x, y + 20), date_text, font=date_font, fill="white")
+    return image
+
+
+def save_note_image(title, output_path):
+    """画像を描画して保存し、保存先のパスを返す"""
+    image = render_note_image(title)
+    with span("image.save", path=output_path) as s:
+        image.save(output_path)
+        s["bytes"] = os.path.getsize(output_path)
+    return output_path
+
+
+# ===== 複数サイズ・形式の書き出し =====
+IMAGE_OUTPUT_DIR = os.path.join(BASE_DIR, "output", "images")
+MIN_QUALITY = 40           # 容量に収めるために下げる画質の下限
+
+FORMAT_EXTENSIONS = {"jpeg": "jpg", "webp": "webp", "png": "png"}
+
+
+class ImageTarget:
+    """書き出す画像1種類（サイズ・形式・画質・容量の上限）"""
+
+    def __init__(self, name, size, formats=("jpeg",), quality=90, max_bytes=None):
+        self.name = name
+        self.size = size
+        self.formats = tuple(formats)
+        self.quality = quality
+        self.max_bytes = max_bytes
+
+
+DEFAULT_TARGETS = (
+    ImageTarget("note_header", (1280, 670), formats=("jpeg", "webp")),
+    ImageTarget("x_card", (1200, 628), formats=("jpeg",), max_bytes=5 * 1024 * 1024),
+    ImageTarget("youtube_thumbnail", (1280, 720), formats=("jpeg",), max_bytes=2 * 1024 * 1024),
+    ImageTarget("preview", (400, 210), formats=("webp", "png"), quality=80, max_bytes=60 * 1024),
+)
+
+
+def _encode(image, fmt, quality):
+    buffer = io.BytesIO()
+    if fmt == "jpeg":
+        image.save(buffer, format="JPEG", quality=quality, optimize=True, progressive=True)
+    elif fmt == "webp":
+        image.save(buffer, format="WEBP", quality=quality, method=4)
+    elif fmt == "png":
+        image.save(buffer, format="PNG", optimize=True)
+    else:
+        raise ValueError(f"未対応の画像形式: {fmt}")
+    return buffer.getvalue()
+
+
+def encode_image(image, fmt, quality=90, max_bytes=None, min_quality=MIN_QUALITY):
+    """画像をエンコードして (バイト列, 使った画質) を返す
+
+    max_bytes を超える場合、JPEG / WebP は収まる中で一番高い画質を二分探索で探す。
+    PNG は可逆なので 256 色に減色して保存し直す（画質は None）。
+    下限まで下げても収まらなければ、一番小さくできた結果を返す。
+    """
+    data = _encode(image, fmt, quality)
+    if max_bytes is None or len(data) <= max_bytes:
+        return data, (None if fmt == "png" else quality)
+
+    if fmt == "png":
+        data = _encode(image.quantize(colors=256), fmt, None)
+        if len(data) > max_bytes:
+            logger.warning("PNG を %d バイト以下にできませんでした（%d バイト）", max_bytes, len(data))
+        return data, None
+
+    best = None
+    low, high = min_quality, quality - 1
+    while low <= high:
+        middle = (low + high) // 2
+        candidate = _encode(image, fmt, middle)
+        if len(candidate) <= max_bytes:
+            best = (candidate, middle)
+            low = middle + 1
+        else:
+            high = middle - 1
+
+    if best is None:
+        logger.warning("%s を %d バイト以下にできませんでした", fmt, max_bytes)
+        best = (_encode(image, fmt, min_quality), min_quality)
+    return best
+
+
+def _export_target(image, target, output_dir, stamp):
+    """1つのサイズに縮小して、指定された形式をすべて書き出す"""
+    # 縦横比が違う場合は中央を切り抜く（タイトルは左寄り・縦中央付近にあるので残る）
+    resized = ImageOps.fit(image, target.size, method=Image.LANCZOS)
+
+    results = []
+    for fmt in target.formats:
+        path = os.path.join(output_dir, f"{target.name}_{stamp}.{FORMAT_EXTENSIONS[fmt]}")
+        with span("image.export", target=target.name, format=fmt) as s:
+            data, quality = encode_image(resized, fmt, target.quality, target.max_bytes)
+            write_atomic(path, data)
+            s["bytes"] = len(data)
+            s["quality"] = quality
+        results.append({
+            "target": target.name,
+            "format": fmt,
+            "size": target.size,
+            "quality": quality,
+            "bytes": len(data),
+            "path": path,
+        })
+    return results
+
+
+def export_images(title, targets=DEFAULT_TARGETS, output_dir=IMAGE_OUTPUT_DIR,
+                  date_text=None, category=None, workers=None):
+    """タイトル画像を1回描画し、全サイズ・全形式を並列に書き出す
+
+    ファイル名は「種類_日時-ランダム.拡張子」で、前回の出力を上書きしない。
+    書き出したファイルの情報（target / format / size / quality / bytes / path）の
+    リストを targets の順で返す。
+    """
+    image = render_note_image(title, date_text=date_text, category=category)
+    stamp = f"{datetime.now():%Y%m%d-%H%M%S}-{uuid.uuid4().hex[:6]}"
+
+    with span("image.export_all", targets=len(targets)), \
+            ThreadPoolExecutor(max_workers=workers or len(targets) or 1) as executor:
+        futures = [
+            executor.submit(_export_target, image, target, output_dir, stamp)
+            for target in targets
+        ]
+        return [result for future in futures for result in future.result()]
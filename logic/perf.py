@@ -0,0 +1,130 @@
+"""処理時間の計測（span / timer）
+
+RSS 取得・解析、プロンプト作成、Gemini の応答時間、画像生成、音声合成などの
+所要時間とデータサイズを記録する。
+
+    with span("rss.fetch", url=url) as s:
+        ...
+        s["bytes"] = len(content)
+
+    @timed("image.render")
+    def render_note_image(...): ...
+
+記録は2か所に残る。
+
+- プロセス内のメモリ（段階ごとに直近 WINDOW 件）→ summary() で p50 / p95 を集計し、
+  Streamlit のサイドバーとデスクトップアプリのパフォーマンスタブに表示する
+- ローテーションする JSONL ファイル（NOTE_APP_PERF_LOG、既定は .cache/perf.jsonl）
+"""
+
+import functools
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from logging.handlers import RotatingFileHandler
+
+from .storage import DEFAULT_CACHE_DIR
+
+
+LOG_PATH = os.getenv("NOTE_APP_PERF_LOG", os.path.join(DEFAULT_CACHE_DIR, "perf.jsonl"))
+LOG_MAX_BYTES = 1_000_000
+LOG_BACKUP_COUNT = 3
+WINDOW = 500               # 段階ごとに集計に使う直近の件数
+
+_samples = {}              # {段階: deque([ms, ...])}
+_samples_lock = threading.Lock()
+
+_logger = logging.getLogger("note_app.perf")
+_logger.propagate = False
+_logger.setLevel(logging.INFO)
+_logger_ready = False
+
+
+def _log(record):
+    global _logger_ready
+    if not LOG_PATH:
+        return
+    if not _logger_ready:
+        with _samples_lock:
+            if not _logger_ready:
+                try:
+                    log_dir = os.path.dirname(LOG_PATH)
+                    if log_dir:     # ファイル名だけの指定はカレントディレクトリに書く
+                        os.makedirs(log_dir, exist_ok=True)
+                    handler = RotatingFileHandler(
+                        LOG_PATH, maxBytes=LOG_MAX_BYTES,
+                        backupCount=LOG_BACKUP_COUNT, encoding="utf-8",
+                    )
+                    handler.setFormatter(logging.Formatter("%(message)s"))
+                    _logger.addHandler(handler)
+                except OSError:
+                    pass  # ログが書けなくてもメモリ上の集計は続ける
+                _logger_ready = True
+    _logger.info(json.dumps(record, ensure_ascii=False, default=str))
+
+
+def record(stage, ms, **fields):
+    """計測結果を1件記録する"""
+    with _samples_lock:
+        samples = _samples.get(stage)
+        if samples is None:
+            samples = _samples[stage] = deque(maxlen=WINDOW)
+        samples.append(ms)
+
+    _log({"ts": round(time.time(), 3), "stage": stage, "ms": round(ms, 2), **fields})
+
+
+@contextmanager
+def span(stage, **fields):
+    """with ブロックの所要時間を記録する。yield した dict に項目を追加できる"""
+    start = time.perf_counter()
+    fields = dict(fields)
+    try:
+        yield fields
+    except BaseException as e:
+        # GeneratorExit（ストリームの途中終了）も失敗として残す
+        fields.setdefault("error", type(e).__name__)
+        raise
+    finally:
+        record(stage, (time.perf_counter() - start) * 1000, **fields)
+
+
+def timed(stage, size=None):
+    """関数の所要時間を記録するデコレーター（size(戻り値) をサイズとして残す）"""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(stage) as s:
+                result = fn(*args, **kwargs)
+                if size is not None:
+                    s["size"] = size(result)
+                return result
+        return wrapper
+    return decorator
+
+
+def _percentile(sorted_values, q):
+    index = min(len(sorted_values) - 1, max(0, round(q * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def summary():
+    """段階ごとの件数・p50・p95・最大（ミリ秒）を段階名の順で返す"""
+    with _samples_lock:
+        snapshot = {stage: sorted(samples) for stage, samples in _samples.items()}
+
+    return [
+        {
+            "stage": stage,
+            "count": len(values),
+            "p50_ms": round(_percentile(values, 0.50), 1),
+            "p95_ms": round(_percentile(values, 0.95), 1),
+            "max_ms": round(values[-1], 1),
+        }
+        for stage, values in sorted(snapshot.items())
+        if values
+    ]
@@ -0,0 +1,181 @@
+"""上位ニュースの記事の事前生成
+
+ニュースを取り直すたびに、よく使うカテゴリ（既定は「経済」と「IT」）の上位 N 件について
+1件ずつ記事を先に生成して、生成結果キャッシュ（logic/response_cache.py）に入れておく。
+ユーザーがそのニュースを1件だけ選んだときは、キャッシュから即座に表示できる。
+
+PREGEN_TOP_N（既定 0 = 無効）で件数を指定したときだけ動く。
+API の利用量は1日あたりのトークン予算（PREGEN_DAILY_TOKENS）の範囲に収める。
+予算の使用量はキャッシュディレクトリの JSON に記録するので、再起動しても
+その日の分は引き継がれる（複数プロセスで同時に動かした場合は概算になる）。
+"""
+
+import datetime
+import json
+import logging
+import os
+import threading
+
+from .gemini import MODEL_NAME, stream_text
+from .gemini_client import estimate_tokens
+from .perf import span
+from .prompts import PROMPT_BUILDERS
+from .response_cache import cached_stream, default_cache, make_key
+from .storage import DEFAULT_CACHE_DIR, write_atomic
+
+
+logger = logging.getLogger(__name__)
+
+PREGEN_TOP_N = int(os.getenv("PREGEN_TOP_N", "0"))
+PREGEN_CATEGORIES = [
+    category.strip()
+    for category in os.getenv("PREGEN_CATEGORIES", "経済,IT").split(",")
+    if category.strip()
+]
+PREGEN_DAILY_TOKENS = int(os.getenv("PREGEN_DAILY_TOKENS", "200000"))
+
+# 生成前の予算確認に使う出力トークンの見積もり（記事1本分）
+OUTPUT_TOKEN_ESTIMATE = 4000
+
+DEFAULT_BUDGET_PATH = os.path.join(DEFAULT_CACHE_DIR, "pregen_budget.json")
+
+
+class DailyBudget:
+    """1日あたりのトークン予算（日付が変わると使用量は 0 に戻る）"""
+
+    def __init__(self, limit=PREGEN_DAILY_TOKENS, path=DEFAULT_BUDGET_PATH):
+        self.limit = limit
+        self.path = path
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _today():
+        return datetime.date.today().isoformat()
+
+    def _load(self):
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                record = json.load(f)
+        except (OSError, ValueError):
+            return 0
+        if record.get("date") != self._today():
+            return 0
+        return int(record.get("used", 0))
+
+    def used(self):
+        with self._lock:
+            return self._load()
+
+    def can_spend(self, tokens):
+        return self.used() + tokens <= self.limit
+
+    def spend(self, tokens):
+        """使用量を加算してアトミックに保存"""
+        with self._lock:
+            record = {"date": self._today(), "used": self._load() + tokens}
+            write_atomic(self.path, json.dumps(record))
+
+
+def pick_top_stories(news_by_category, top_n=PREGEN_TOP_N, categories=PREGEN_CATEGORIES):
+    """事前生成するニュース（指定カテゴリの先頭 top_n 件ずつ）"""
+    return [
+        news
+        for category in categories
+        for news in list(news_by_category.get(category, ()))[:top_n]
+    ]
+
+
+class Pregenerator:
+    """ニュース更新のたびに上位ニュースの記事をバックグラウンドで生成する
+
+    kinds は事前生成するプロンプトの種類（Streamlit は "note_tagged"、
+    デスクトップアプリは "note_article" など、表示側が使うものに合わせる）。
+    生成は専用スレッドで1件ずつ行い、ユーザーの生成と同じキーなら
+    single-flight で相乗りされるので二重に API を呼ぶことはない。
+    """
+
+    def __init__(self, client, kinds=("note_tagged",), top_n=PREGEN_TOP_N,
+                 categories=PREGEN_CATEGORIES, budget=None,
+                 cache=default_cache, model=MODEL_NAME):
+        self.client = client
+        self.kinds = tuple(kinds)
+        self.top_n = top_n
+        self.categories = list(categories)
+        self.budget = budget or DailyBudget()
+        self.cache = cache
+        self.model = model
+        self._pending = None
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+
+    @property
+    def enabled(self):
+        return self.top_n > 0 and bool(self.kinds)
+
+    def on_snapshot(self, snapshot):
+        """NewsRefresher.add_listener に渡す用"""
+        self.schedule(snapshot.by_category)
+
+    def schedule(self, news_by_category):
+        """最新のニュース一覧で事前生成をやり直す（まだ始めていない分は捨てる）"""
+        if not self.enabled:
+            return
+        stories = pick_top_stories(news_by_category, self.top_n, self.categories)
+        with self._lock:
+            self._pending = stories
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="pregenerate", daemon=True
+                )
+                self._thread.start()
+        self._wakeup.set()
+
+    # ===== 生成スレッド =====
+    def _take_pending(self):
+        with self._lock:
+            stories, self._pending = self._pending, None
+            return stories
+
+    def _run(self):
+        while True:
+            self._wakeup.wait()
+            self._wakeup.clear()
+            stories = self._take_pending()
+            if stories:
+                self._generate_all(stories)
+
+    def _generate_all(self, stories):
+        for news in stories:
+            for kind in self.kinds:
+                if self._pending is not None:
+                    return   # 新しい一覧が届いた：そちらを優先する
+                if not self._generate(kind, news):
+                    return   # 予算切れ
+
+    def _generate(self, kind, news):
+        """1件生成する。予算が足りなければ False"""
+        news_list = [news]
+        key = make_key(self.model, kind, news_list, getattr(self.client, "base_url", None))
+        if self.cache.contains(key):
+            return True
+
+        prompt = PROMPT_BUILDERS[kind](news_list)
+        prompt_tokens = estimate_tokens(prompt)
+        if not self.budget.can_spend(prompt_tokens + OUTPUT_TOKEN_ESTIMATE):
+            logger.info("事前生成の1日の予算に達しました（使用量 %d）", self.budget.used())
+            return False
+
+        try:
+            with span("pregen.generate", kind=kind) as s:
+                text = "".join(cached_stream(
+                    self.cache, key,
+                    lambda: stream_text(self.client, prompt, model=self.model)
+                ))
+                s["tokens"] = prompt_tokens + estimate_tokens(text)
+        except Exception as e:
+            logger.warning("事前生成に失敗 [%s] %s: %s", kind, news.get("title"), e)
+            return True
+
+        self.budget.spend(s["tokens"])
+        return True
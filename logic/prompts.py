@@ -0,0 +1,323 @@
+"""Gemini に渡すプロンプトの組み立て
+
+テンプレートを変更したら PROMPT_VERSIONS の値を上げること。
+生成結果キャッシュ（logic/response_cache.py）のキーに含まれるため、
+古いテンプレートで作られた結果が再利用されなくなる。
+
+RSS の概要は HTML タグ・文字参照を取り除いてから埋め込み、
+ニュース部分が NEWS_TOKEN_BUDGET（環境変数 PROMPT_NEWS_TOKEN_BUDGET）を
+超える場合は各ニュースの概要を文の区切りで短くする。
+"""
+
+import html
+import logging
+import os
+import re
+
+from .gemini_client import estimate_tokens
+from .news_dedup import merge_duplicates
+from .perf import timed
+
+
+logger = logging.getLogger(__name__)
+
+PROMPT_VERSIONS = {
+    "note_tagged": 2,
+    "note_article": 2,
+    "x_thread": 2,
+    "video_script": 2,
+}
+
+# プロンプトに埋め込むニュース部分のトークン上限（テンプレート部分は含まない）
+NEWS_TOKEN_BUDGET = int(os.getenv("PROMPT_NEWS_TOKEN_BUDGET", "4000"))
+
+# 概要をこれより短くはしない（短くしすぎると記事の材料にならない）
+MIN_SUMMARY_CHARS = 40
+
+_TAG = re.compile(r"<[^>]+>")
+_SENTENCE_END = re.compile(r"(?<=[。．！？!?])")
+
+
+def clean_summary(text):
+    """HTML タグ・文字参照・連続空白を取り除いた概要"""
+    text = _TAG.sub(" ", html.unescape(text or ""))
+    return " ".join(text.split())
+
+
+def truncate_summary(text, max_chars):
+    """max_chars 以内に収まるよう、文の区切りで概要を短くする"""
+    if len(text) <= max_chars:
+        return text
+
+    kept = ""
+    for sentence in _SENTENCE_END.split(text):
+        if len(kept) + len(sentence) > max_chars:
+            break
+        kept += sentence
+    if not kept:
+        # 1文目から長すぎる場合は文字数で切る
+        kept = text[:max_chars - 1]
+    return kept + "…"
+
+
+def compact_news(news_list, budget=None):
+    """重複をまとめ、概要を整形し、ニュース部分が予算に収まるよう概要を短くする"""
+    budget = NEWS_TOKEN_BUDGET if budget is None else budget
+    news_list = [
+        dict(news, summary=clean_summary(news.get("summary", "")))
+        for news in merge_duplicates(news_list)
+    ]
+    if not news_list:
+        return news_list
+
+    total = sum(estimate_tokens(news["title"] + news["summary"]) for news in news_list)
+    if total <= budget:
+        return news_list
+
+    # タイトルは残し、概要に使える分を均等に割り当てる
+    titles = sum(estimate_tokens(news["title"]) for news in news_list)
+    per_summary = max(MIN_SUMMARY_CHARS, (budget - titles) // len(news_list))
+    logger.info(
+        "ニュース部分が予算を超えたため概要を短縮: 約%dトークン → 予算%dトークン",
+        total, budget,
+    )
+    return [
+        dict(news, summary=truncate_summary(news["summary"], per_summary))
+        for news in news_list
+    ]
+
+
+def prompt_size_text(prompt):
+    """プロンプトの大きさの表示用テキスト"""
+    return f"プロンプト：約{estimate_tokens(prompt):,}トークン（{len(prompt):,}文字）"
+
+
+def format_news_text(news_list, with_category=False, budget=None):
+    """選択ニュースをプロンプト用のテキストにまとめる
+
+    ほぼ同じニュースが複数選ばれていたら1件にまとめ、概要は
+    compact_news で整形・短縮したものを使う。
+    """
+    news_text = ""
+    for i, news in enumerate(compact_news(news_list, budget), start=1):
+        if with_category:
+            news_text += (
+                f"\n【ニュース{i}】\n"
+                f"カテゴリ：{news['category']}\n"
+                f"タイトル：{news['title']}\n"
+                f"概要：{news['summary']}\n"
+            )
+        else:
+            news_text += (
+                f"【ニュース{i}】\n"
+                f"タイトル: {news['title']}\n"
+                f"概要: {news['summary']}\n\n"
+            )
+    return news_text
+
+
+@timed("prompt.note_tagged", size=len)
+def build_note_tagged_prompt(news_list, budget=None):
+    """Streamlit 用：【TITLE】〜【HASHTAG】のタグ付き NOTE 記事"""
+    news_text = format_news_text(news_list, with_category=True, budget=budget)
+    return f"""
+あなたはNOTEで継続的に収益を上げているプロ編集者です。
+
+以下のニュースを元に、
+「無料部分」と「有料部分」が明確に分かれた
+NOTE向け記事を1本作成してください。
+
+【重要ルール】
+- 煽らない
+- 信頼感のある落ち着いた文体
+- 社会人・ビジネスパーソン向け
+- 専門用語は噛み砕いて説明
+- 有料に価値が集まる構成にする
+- 箇条書き記号（*, -, ・）やMarkdown記法は一切使用しないでください
+- すべて通常の日本語文章（段落）として出力してください
+- 太文字や絵文字など文章をわかりやすく伝える要素は積極的に使用してください
+- 株価への影響については以下のルールで記述してください。
+
+・断定は避ける
+・過去の類似事例を参考にした「想定レンジ」として示す
+・％で表現する
+
+例：
+短期的には+3〜8%程度の上昇が想定される
+ネガティブな場合は-5〜-12%程度の下落リスクがある
+
+- 有料パートでは以下を必ず含めてください。
+
+・短期（1日〜1週間）
+・中期（1〜3か月）
+それぞれの株価影響レンジ（％）
+
+
+
+【文字量の目安】
+- FREE：600〜800文字
+- PAID：800〜1200文字
+
+【出力形式（厳守）】
+以下のタグを必ず使い、順番も変えないこと。
+
+【TITLE】
+記事タイトル（1行）
+
+【FREE】
+・導入
+・ニュースの要点
+・なぜ重要か
+・「続きが読みたい」と思わせるところまで
+
+【PAYWALL】
+ここから先は有料です。
+この続きでは、
+・背景の深掘り
+・本質的な構造
+・今後の展開予測
+・社会人が取るべき具体的アクション
+を解説します。
+
+【PAID】
+・表に出ない背景
+・因果関係の整理
+・中長期的な影響
+・読者が「知れてよかった」と思う視点
+
+【SNS】
+この記事を紹介するSNS用要約（140文字以内）
+
+【HASHTAG】
+この記事に関連するハッシュタグ（5個程度、#付きで）
+
+【ニュース】
+{news_text}
+"""
+
+
+@timed("prompt.note_article", size=len)
+def build_note_article_prompt(news_list, budget=None):
+    """NoteTab 用：無料・有料部分に分かれた NOTE 記事"""
+    news_text = format_news_text(news_list, budget=budget)
+    return f"""
+あなたはNOTEで収益化を目的としたプロの編集者です。
+
+以下のニュースを元に、
+NOTE用の記事を書いてください。
+
+【構成ルール】
+必ず次の構成で出力してください。
+
+--------------------------------
+【タイトル】
+（NOTE向け・知的・煽らない）
+
+【無料公開部分】
+・導入
+・ニュースの要点整理
+・背景の解説
+・ここまででも「読んでよかった」と思える内容
+
+【ここから有料】
+※この見出しを必ず入れる
+
+【有料部分】
+・一歩踏み込んだ考察
+・ニュースの裏にある構造
+・今後どうなりそうか
+・社会人が取るべき視点や行動
+--------------------------------
+
+【条件】
+・落ち着いた知的な文体
+・煽らない
+・断定しすぎない
+・ニュース解説＋考察型
+・全体で1500〜2000文字程度
+
+【ニュース】
+{news_text}
+
+"""
+
+
+@timed("prompt.x_thread", size=len)
+def build_x_thread_prompt(news_list, budget=None):
+    """XTab 用：X（旧Twitter）のスレッド投稿"""
+    news_text = format_news_text(news_list, budget=budget)
+    return f"""
+あなたは「デイリーニュースCFO マーク」です。
+
+以下のニュースを、X（旧Twitter）向けに
+1ニュース＝4〜5ポストのスレッド形式でまとめてください。
+
+【ルール】
+- 1ポスト140文字以内
+- 丁寧で落ち着いた口調
+- 煽らない
+- 絵文字なし
+- そのままコピペできる形式
+
+【ニュース】
+{news_text}
+"""
+
+
+@timed("prompt.video_script", size=len)
+def build_video_script_prompt(news_list, budget=None):
+    """NewsTab 用：デイリーニュースCFO マークの動画台本"""
+    news_text = format_news_text(news_list, budget=budget)
+    return f"""
+あなたは「デイリーニュースCFO マーク」というキャラクターとして話します。
+
+【キャラクター設定】
+- 年齢：38歳の男性
+- 職業：企業のCFO（Chief Friendly Officer）
+- 経歴：元コンサル、元新聞社の経済部記者、現在は経営企画室で働く社会人
+- 性格：落ち着いていて論理的、視聴者に寄り添う、事実ベースで淡々と説明
+- 話し方：丁寧で落ち着いたテンポ、語尾は「〜です」「〜ですね」
+- 口癖：「今日も3分で、あなたの情報武装をお手伝いします」「ポイントを簡潔に整理しますね」
+- 禁止事項：キャラを変えない、口調を変えない、若者言葉を使わない、感情的にならない、他のキャラを登場させない
+
+【見た目】
+- 黒髪の短髪、細いフレームの眼鏡
+- ネイビーのスーツ、白シャツ、落ち着いた色のネクタイ
+- 穏やかな目元で、落ち着いた雰囲気
+- 声は低めで聞き取りやすい
+
+【冒頭の挨拶】
+必ず次の文言から始めてください：
+「デイリーニュースCFOのマークです。今日も3分で、あなたの情報武装をお手伝いします。」
+
+【構成テンプレート】
+1. 導入（20秒）
+    - 固定挨拶
+    - 今日扱うニュースの概要
+    - 視聴者のメリット提示
+
+2. 本編（100〜130秒）
+    ニュースごとに以下を説明：
+    - 要点（30文字以内）
+    - 背景（なぜ起きたのか）
+    - 社会人にとっての影響（ビジネス視点）
+    - 今後どうなるか（短期予測）
+
+3. まとめ（30秒）
+    - 今日のポイントを3つに整理
+    - 明日へのアクションを一言
+    - 固定の締めの挨拶
+
+【対象ニュース】
+{news_text}
+
+全体で150〜180秒程度のスクリプトにまとめてください。
+"""
+
+
+PROMPT_BUILDERS = {
+    "note_tagged": build_note_tagged_prompt,
+    "note_article": build_note_article_prompt,
+    "x_thread": build_x_thread_prompt,
+    "video_script": build_video_script_prompt,
+}
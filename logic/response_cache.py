@@ -0,0 +1,196 @@
+"""Gemini 生成結果の永続キャッシュ（SQLite）
+
+キーは「モデル名・プロンプト種別・テンプレートのバージョン・ニュース部分の
+トークン上限（PROMPT_NEWS_TOKEN_BUDGET）・正規化したニュース」のハッシュ。同じニュース選択で再生成したときは API を呼ばずに結果を返す。
+Streamlit とデスクトップアプリの各タブで同じデータベースを共有する。
+
+GEMINI_BASE_URL で負荷試験用の代替サーバー（benchmarks/mock_gemini.py）に
+接続しているときは、その接続先もキーに含める（make_key の base_url）。
+代替サーバーの疑似応答が本物の結果として使われることはなく、負荷試験でも
+キャッシュに当たらずに毎回サーバーへリクエストが届く。
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from .prompts import NEWS_TOKEN_BUDGET, PROMPT_VERSIONS
+from .single_flight import default_flight
+from .storage import DEFAULT_CACHE_DIR
+
+
+DEFAULT_DB_PATH = os.path.join(DEFAULT_CACHE_DIR, "responses.sqlite3")
+DEFAULT_MAX_ENTRIES = 500
+DEFAULT_MAX_AGE = 7 * 24 * 60 * 60  # 秒
+
+
+def normalize_news(news_list):
+    """キー用にニュースを正規化（前後・連続空白の差を無視）"""
+    return [
+        {
+            "category": " ".join(str(news.get("category", "")).split()),
+            "title": " ".join(str(news.get("title", "")).split()),
+            "summary": " ".join(str(news.get("summary", "")).split()),
+        }
+        for news in news_list
+    ]
+
+
+def make_key(model, kind, news_list, base_url=None, budget=None):
+    """生成結果を一意に表すハッシュキー
+
+    base_url は接続先を変えているときだけ渡す（None なら本物の API 用のキー）。
+    budget はプロンプト作成時のニュース部分のトークン上限（None なら NEWS_TOKEN_BUDGET）。
+    上限が変わるとプロンプトに入る概要の長さも変わるので、別の結果として扱う。
+    """
+    fields = {
+        "model": model,
+        "kind": kind,
+        "version": PROMPT_VERSIONS[kind],
+        "budget": NEWS_TOKEN_BUDGET if budget is None else budget,
+        "news": normalize_news(news_list),
+    }
+    if base_url:
+        fields["base_url"] = base_url
+    payload = json.dumps(
+        fields,
+        ensure_ascii=False,
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    def __init__(self, path=DEFAULT_DB_PATH,
+                 max_entries=DEFAULT_MAX_ENTRIES, max_age=DEFAULT_MAX_AGE):
+        self.path = path
+        self.max_entries = max_entries
+        self.max_age = max_age
+        self._init_lock = threading.Lock()
+        self._initialized = False
+
+    def _connect(self):
+        # 接続はスレッドごとに作る（sqlite3 の接続はスレッド間で共有しない）
+        conn = sqlite3.connect(self.path, timeout=10)
+        with self._init_lock:
+            if not self._initialized:
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute(
+                    """
+                    CREATE TABLE IF NOT EXISTS responses (
+                        key TEXT PRIMARY KEY,
+                        text TEXT NOT NULL,
+                        created_at REAL NOT NULL,
+                        accessed_at REAL NOT NULL
+                    )
+                    """
+                )
+                conn.commit()
+                self._initialized = True
+        return conn
+
+    def get(self, key):
+        """キャッシュ済みの生成結果を返す。無い・期限切れなら None"""
+        if not os.path.exists(self.path):
+            return None
+
+        conn = self._connect()
+        try:
+            row = conn.execute(
+                "SELECT text, created_at FROM responses WHERE key = ?",
+                (key,)
+            ).fetchone()
+            if row is None:
+                return None
+
+            text, created_at = row
+            now = time.time()
+            if now - created_at > self.max_age:
+                conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                conn.commit()
+                return None
+
+            conn.execute(
+                "UPDATE responses SET accessed_at = ? WHERE key = ?",
+                (now, key)
+            )
+            conn.commit()
+            return text
+        finally:
+            conn.close()
+
+    def contains(self, key):
+        """有効な生成結果があるか（最終参照時刻は更新しない）"""
+        if not os.path.exists(self.path):
+            return False
+
+        conn = self._connect()
+        try:
+            row = conn.execute(
+                "SELECT 1 FROM responses WHERE key = ? AND created_at >= ?",
+                (key, time.time() - self.max_age)
+            ).fetchone()
+            return row is not None
+        finally:
+            conn.close()
+
+    def put(self, key, text):
+        """生成結果を保存して、古いものを削除"""
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        now = time.time()
+
+        conn = self._connect()
+        try:
+            conn.execute(
+                "INSERT OR REPLACE INTO responses (key, text, created_at, accessed_at) "
+                "VALUES (?, ?, ?, ?)",
+                (key, text, now, now)
+            )
+            self._evict(conn, now)
+            conn.commit()
+        finally:
+            conn.close()
+
+    def _evict(self, conn, now):
+        """期限切れを削除し、件数上限を超えた分は最終参照の古い順に削除"""
+        conn.execute(
+            "DELETE FROM responses WHERE created_at < ?",
+            (now - self.max_age,)
+        )
+        conn.execute(
+            """
+            DELETE FROM responses WHERE key NOT IN (
+                SELECT key FROM responses
+                ORDER BY accessed_at DESC
+                LIMIT ?
+            )
+            """,
+            (self.max_entries,)
+        )
+
+
+def cached_stream(cache, key, stream_factory, force=False, flight=default_flight):
+    """キャッシュがあれば全文を1回で返し、無ければストリーミングして保存する
+
+    同じキーの生成が進行中なら、新しく呼ばずにそのストリームに相乗りする
+    （logic/single_flight.py）。
+    force=True のときはキャッシュを無視して再生成する（結果は上書き保存）。
+    途中で中断された場合と、空の応答（ブロックされた場合など）は保存しない。
+    """
+    if not force:
+        text = cache.get(key)
+        if text:
+            yield text
+            return
+
+    def store(text):
+        if text:
+            cache.put(key, text)
+
+    yield from flight.stream(key, stream_factory, on_complete=store)
+
+
+default_cache = ResponseCache()
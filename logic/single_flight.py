@@ -0,0 +1,115 @@
+"""同じ生成リクエストの相乗り（single-flight）
+
+複数の Streamlit セッションやタブが、生成中のものと同じキー
+（モデル・種類・ニュース選択）で生成を始めたときは、新しく API を呼ばずに
+進行中のストリームに途中から参加する。参加した時点までのテキストを
+まとめて受け取り、以降は届いた順に全員へ配る。
+
+生成は専用スレッドで行うので、最初に呼んだセッションが離脱しても
+他の参加者の生成は続く。参加者が全員いなくなった時点で生成を打ち切る。
+"""
+
+import logging
+import threading
+
+
+logger = logging.getLogger(__name__)
+
+
+class _Flight:
+    def __init__(self):
+        self.cond = threading.Condition()
+        self.chunks = []
+        self.done = False
+        self.error = None
+        self.subscribers = 0     # SingleFlight._lock で保護する
+
+
+class SingleFlight:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._flights = {}
+
+    def stream(self, key, stream_factory, on_complete=None):
+        """key の生成に参加して、テキスト片を順に返すジェネレーター
+
+        進行中の生成が無ければ stream_factory() で新しく始める。
+        on_complete(全文) は最後まで生成できたときに1回だけ呼ばれる。
+        """
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+            flight.subscribers += 1
+
+        if leader:
+            threading.Thread(
+                target=self._produce,
+                args=(key, flight, stream_factory, on_complete),
+                daemon=True,
+            ).start()
+
+        return self._follow(flight)
+
+    def _produce(self, key, flight, stream_factory, on_complete):
+        completed = False
+        try:
+            stream = stream_factory()
+            try:
+                for text in stream:
+                    with self._lock:
+                        if flight.subscribers == 0:
+                            # 全員が離脱した：生成を打ち切り、新しい参加者は別の生成を始める
+                            self._flights.pop(key, None)
+                            break
+                    with flight.cond:
+                        flight.chunks.append(text)
+                        flight.cond.notify_all()
+                else:
+                    completed = True
+            finally:
+                close = getattr(stream, "close", None)
+                if close:
+                    close()
+
+            # 一覧から外す前に保存して、直後に来た参加者がキャッシュを使えるようにする
+            if completed and on_complete:
+                try:
+                    on_complete("".join(flight.chunks))
+                except Exception as e:
+                    logger.warning("生成結果の保存に失敗: %s", e)
+        except Exception as e:
+            flight.error = e
+        finally:
+            with self._lock:
+                if self._flights.get(key) is flight:
+                    del self._flights[key]
+            with flight.cond:
+                flight.done = True
+                flight.cond.notify_all()
+
+    def _follow(self, flight):
+        index = 0
+        try:
+            while True:
+                with flight.cond:
+                    while index >= len(flight.chunks) and not flight.done:
+                        flight.cond.wait()
+                    new_chunks = flight.chunks[index:]
+                    index += len(new_chunks)
+                    finished = flight.done and index >= len(flight.chunks)
+
+                for text in new_chunks:
+                    yield text
+
+                if finished:
+                    if flight.error is not None:
+                        raise flight.error
+                    return
+        finally:
+            with self._lock:
+                flight.subscribers -= 1
+
+
+default_flight = SingleFlight()
@@ -0,0 +1,39 @@
+"""アプリのデータ置き場とファイルの書き込み
+
+キャッシュ・アーカイブ・計測ログなどはすべて DEFAULT_CACHE_DIR（環境変数
+NOTE_APP_CACHE_DIR、既定はリポジトリ直下の .cache）の下に置く。
+書き込みは一時ファイル + os.replace で行うため、Streamlit の複数ワーカーや
+デスクトップアプリから同じディレクトリを同時に使っても壊れない。
+"""
+
+import os
+import tempfile
+
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_CACHE_DIR = os.getenv(
+    "NOTE_APP_CACHE_DIR",
+    os.path.join(BASE_DIR, ".cache")
+)
+
+
+def write_atomic(path, data):
+    """一時ファイルに書いてから os.replace で置き換える（str は UTF-8 で書く）
+
+    途中で失敗しても元のファイルは壊れず、一時ファイルも残らない。
+    """
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory or ".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
@@ -0,0 +1,269 @@
+"""台本の音声化（Google Cloud Text-to-Speech）
+
+150〜180 秒の台本は1リクエストの文字数上限を超え、1回で合成すると遅いため、
+
+- 文の区切りで台本を分割し（長すぎる文は読点でさらに分割）
+- 各チャンクを並列に合成し
+- MP3 を元の順番どおりに連結する
+
+チャンクごとの音声は「声の設定＋テキスト」のハッシュでディスクに保存するので、
+台本を一部だけ直して作り直したときは変更した文だけが合成される。
+
+    python -m logic.tts script.txt -o output/script.mp3
+
+テストや開発時は FakeTTSClient を渡すと API を呼ばずに動作を確認できる。
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+from .perf import span
+from .storage import DEFAULT_CACHE_DIR, write_atomic
+
+
+LANGUAGE_CODE = "ja-JP"
+VOICE_NAME = "ja-JP-Neural2-D"
+
+# API の上限は 5000 バイト。日本語は1文字3バイトなので余裕を持たせる
+MAX_CHUNK_BYTES = 4500
+DEFAULT_WORKERS = 6
+
+# 文末の直後に続く閉じ括弧や記号（これだけでは1文にせず、前の文に付ける）
+_TRAILING_MARKS = "。！？!?」』）)】〕〉》”’"
+# 「…。」のように閉じ括弧が続くときは、閉じ括弧の後ろで切る
+_SENTENCE_END = re.compile(
+    r"(?<=[。！？!?])(?![。！？!?」』）)】〕〉》”’])"
+    r"|(?<=[。！？!?][」』）)】〕〉》”’])(?![」』）)】〕〉》”’])"
+    r"|\n+"
+)
+_CLAUSE_END = re.compile(r"(?<=[、，,])")
+
+
+def _byte_len(text):
+    return len(text.encode("utf-8"))
+
+
+def _split_long(text, max_bytes):
+    """max_bytes を超える文を読点、それでも長ければ文字数で分ける"""
+    if _byte_len(text) <= max_bytes:
+        return [text]
+
+    pieces = []
+    current = ""
+    for clause in _CLAUSE_END.split(text):
+        while _byte_len(clause) > max_bytes:
+            # 読点の無い長文は文字単位で切る
+            cut = max_bytes // 4
+            head, clause = clause[:cut], clause[cut:]
+            if current:
+                pieces.append(current)
+                current = ""
+            pieces.append(head)
+        if current and _byte_len(current + clause) > max_bytes:
+            pieces.append(current)
+            current = ""
+        current += clause
+    if current:
+        pieces.append(current)
+    return pieces
+
+
+def split_script(script, max_bytes=MAX_CHUNK_BYTES):
+    """台本を合成単位（基本は1文）に分割する。空行・空白だけの文は除く"""
+    sentences = []
+    for sentence in _SENTENCE_END.split(script or ""):
+        sentence = sentence.strip()
+        if not sentence:
+            continue
+        if sentences and not sentence.strip(_TRAILING_MARKS):
+            # 「…。」の 」 や ！？ の ？ だけが残ったものは前の文に戻す
+            sentences[-1] += sentence
+        else:
+            sentences.append(sentence)
+
+    chunks = []
+    for sentence in sentences:
+        chunks.extend(_split_long(sentence, max_bytes))
+    return chunks
+
+
+def strip_id3(data):
+    """先頭の ID3v2 タグを取り除く（連結したときに途中にタグが入らないように）"""
+    if data[:3] != b"ID3" or len(data) < 10:
+        return data
+    size = 0
+    for byte in data[6:10]:
+        size = (size << 7) | (byte & 0x7F)
+    return data[10 + size:]
+
+
+def join_mp3(segments):
+    """MP3 のセグメントを順番どおりに連結する（2つ目以降は ID3 タグを外す）"""
+    return b"".join(
+        segment if i == 0 else strip_id3(segment)
+        for i, segment in enumerate(segments)
+    )
+
+
+# ===== TTS クライアント =====
+class GoogleTTSClient:
+    """Google Cloud Text-to-Speech（ライブラリは初回合成時に import する）"""
+
+    def __init__(self):
+        self._client = None
+
+    def synthesize(self, text, voice):
+        from google.cloud import texttospeech
+
+        if self._client is None:
+            self._client = texttospeech.TextToSpeechClient()
+
+        response = self._client.synthesize_speech(
+            input=texttospeech.SynthesisInput(text=text),
+            voice=texttospeech.VoiceSelectionParams(
+                language_code=voice["language_code"],
+                name=voice["name"],
+            ),
+            audio_config=texttospeech.AudioConfig(
+                audio_encoding=texttospeech.AudioEncoding.MP3,
+                speaking_rate=voice.get("speaking_rate", 1.0),
+            ),
+        )
+        return response.audio_content
+
+
+class FakeTTSClient:
+    """API を呼ばない TTS クライアント（動作確認用）
+
+    テキストをそのまま埋め込んだバイト列を返し、呼び出されたテキストを記録する。
+    """
+
+    def __init__(self):
+        self.calls = []
+
+    def synthesize(self, text, voice):
+        self.calls.append(text)
+        return f"[{voice['name']}]{text}\n".encode("utf-8")
+
+
+def make_voice(name=VOICE_NAME, language_code=LANGUAGE_CODE, speaking_rate=1.0):
+    return {"name": name, "language_code": language_code, "speaking_rate": speaking_rate}
+
+
+# ===== チャンクのキャッシュ =====
+class AudioCache:
+    def __init__(self, cache_dir=None):
+        self.cache_dir = os.path.join(cache_dir or DEFAULT_CACHE_DIR, "tts")
+
+    @staticmethod
+    def make_key(text, voice):
+        payload = json.dumps({"text": text, "voice": voice}, ensure_ascii=False, sort_keys=True)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.mp3")
+
+    def load(self, key):
+        try:
+            with open(self._path(key), "rb") as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def store(self, key, data):
+        write_atomic(self._path(key), data)
+
+
+default_cache = AudioCache()
+
+
+# ===== 合成 =====
+def synthesize_script(script, client=None, voice=None, cache=default_cache,
+                      workers=DEFAULT_WORKERS, on_progress=None):
+    """台本を分割・並列合成して MP3 のバイト列と統計を返す
+
+    on_progress(完了数, 全チャンク数) は合成が1つ終わるたびに呼ばれる
+    （どのスレッドから呼ばれるかは決まっていない）。
+    """
+    client = client or GoogleTTSClient()
+    voice = voice or make_voice()
+    chunks = split_script(script)
+    keys = [AudioCache.make_key(text, voice) for text in chunks]
+
+    segments = [cache.load(key) if cache else None for key in keys]
+    missing = [i for i, data in enumerate(segments) if data is None]
+    done = len(chunks) - len(missing)
+    if on_progress:
+        on_progress(done, len(chunks))
+
+    def synthesize(i):
+        with span("tts.chunk", chars=len(chunks[i])) as s:
+            data = client.synthesize(chunks[i], voice)
+            s["bytes"] = len(data)
+        if cache:
+            cache.store(keys[i], data)
+        return i, data
+
+    with span("tts.synthesize", chunks=len(chunks), synthesized=len(missing)):
+        if missing:
+            with ThreadPoolExecutor(max_workers=max(1, min(workers, len(missing)))) as executor:
+                for i, data in executor.map(synthesize, missing):
+                    segments[i] = data
+                    done += 1
+                    if on_progress:
+                        on_progress(done, len(chunks))
+
+    stats = {
+        "chunks": len(chunks),
+        "cached": len(chunks) - len(missing),
+        "synthesized": len(missing),
+    }
+    return join_mp3(segments), stats
+
+
+def save_script_audio(script, output_path, **kwargs):
+    """台本を音声化して output_path に保存し、統計を返す"""
+    audio, stats = synthesize_script(script, **kwargs)
+    directory = os.path.dirname(output_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(output_path, "wb") as f:
+        f.write(audio)
+    return stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="台本テキストを MP3 にする")
+    parser.add_argument("script", help="台本のテキストファイル")
+    parser.add_argument("-o", "--out", default="output/script.mp3", help="出力する MP3")
+    parser.add_argument("--voice", default=VOICE_NAME, help="声の名前")
+    parser.add_argument("--rate", type=float, default=1.0, help="話す速さ")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="同時に合成する数")
+    parser.add_argument("--fake", action="store_true", help="API を呼ばずに動作確認する")
+    args = parser.parse_args(argv)
+
+    with open(args.script, encoding="utf-8") as f:
+        script = f.read()
+
+    stats = save_script_audio(
+        script,
+        args.out,
+        client=FakeTTSClient() if args.fake else None,
+        voice=make_voice(args.voice, speaking_rate=args.rate),
+        cache=None if args.fake else default_cache,
+        workers=args.workers,
+    )
+    print(
+        f"{args.out} を生成しました"
+        f"（{stats['chunks']} チャンク / 新規合成 {stats['synthesized']} / キャッシュ {stats['cached']}）"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,12 +1,50 @@
+import time
+
+_START = time.perf_counter()
+
+import sys
+
+from PySide6.QtCore import QTimer
 from PySide6.QtWidgets import QApplication
 from ui.main_window import MainWindow
-import sys
+
+
+# 起動時に読み込まれていないことを確認したい重いモジュール
+HEAVY_MODULES = [
+    "google.genai",
+    "googleapiclient.discovery",
+    "google_auth_oauthlib.flow",
+    "PIL.Image",
+    "feedparser",
+    "requests",
+]
+
+
+def print_startup_report(window_created):
+    """起動時間と重いモジュールの読み込み状況を表示する
+
+    import ごとの詳細は python -X importtime main.py --startup-report で確認できる。
+    """
+    first_paint = time.perf_counter()
+    print("===== 起動レポート =====")
+    print(f"MainWindow 作成まで : {(window_created - _START) * 1000:.0f} ms")
+    print(f"初回描画まで       : {(first_paint - _START) * 1000:.0f} ms")
+    for name in HEAVY_MODULES:
+        state = "読み込み済み" if name in sys.modules else "未読み込み（初回使用時）"
+        print(f"  {name:<28} {state}")
+
 
 def main():
     app = QApplication(sys.argv)
     window = MainWindow()
+    window_created = time.perf_counter()
     window.show()
+
+    if "--startup-report" in sys.argv:
+        # イベントループが回り始めた直後＝初回描画後に計測する
+        QTimer.singleShot(0, lambda: print_startup_report(window_created))
+
     sys.exit(app.exec())
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -1,39 +1,61 @@
 import streamlit as st
-import feedparser
-import google.generativeai as genai
-import re
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
+
+from logic.article_parser import ArticleStreamParser
+from logic.gemini import MODEL_NAME, stream_text
+from logic.gemini_client import get_client
+from logic.news_archive import default_archive as news_archive
+from logic.news_refresher import default_refresher as news_refresher
+from logic.perf import span, summary as perf_summary
+from logic.pregenerate import Pregenerator
+from logic.prompts import PROMPT_BUILDERS, build_note_tagged_prompt, prompt_size_text
+from logic.response_cache import cached_stream, default_cache as response_cache, make_key
+
+@st.cache_resource
+def load_client():
+    """レート制限・再試行付きの共有クライアント（全セッションで1つ）
+
+    GEMINI_BASE_URL を指定すると負荷試験用の代替サーバーに接続する。
+    """
+    return get_client(
+        st.secrets["GEMINI_API_KEY"],
+        base_url=st.secrets.get("GEMINI_BASE_URL"),
+    )
 
-genai.configure(api_key=st.secrets["GEMINI_API_KEY"])
-model = genai.GenerativeModel("gemini-2.5-flash")
 
-# =========================
-# 記事解析関数
-# =========================
-def parse_article(text):
-    # Extract sections using regex
-    title_match = re.search(r'【TITLE】\s*(.*?)\s*【FREE】', text, re.DOTALL)
-    free_match = re.search(r'【FREE】\s*(.*?)\s*【PAYWALL】', text, re.DOTALL)
-    paid_match = re.search(r'【PAID】\s*(.*?)\s*【SNS】', text, re.DOTALL)
-    sns_match = re.search(r'【SNS】\s*(.*?)\s*【HASHTAG】', text, re.DOTALL)
-    hashtag_match = re.search(r'【HASHTAG】\s*(.*?)\s*【ニュース】', text, re.DOTALL)
-
-    return {
-        "title": title_match.group(1).strip() if title_match else "",
-        "free": free_match.group(1).strip() if free_match else "",
-        "paid": paid_match.group(1).strip() if paid_match else "",
-        "sns": sns_match.group(1).strip() if sns_match else "",
-        "hashtag": hashtag_match.group(1).strip() if hashtag_match else ""
-    }
+client = load_client()
 
-# =========================
-# セッション管理
-# =========================
-if "free_article" not in st.session_state:
-    st.session_state.free_article = None
+# 記事と同時に生成できる追加の種類
+EXTRA_KINDS = {
+    "x_thread": "🐦 X投稿スレッド",
+    "video_script": "🎬 動画台本",
+}
 
-if "paid_article" not in st.session_state:
-    st.session_state.paid_article = None
 
+def generate_cached(kind, news_list, force=False):
+    """キャッシュ付きで1種類の文章を生成（バックグラウンドスレッド用）
+
+    他のセッションが同じ内容を生成中なら、その結果に相乗りする。
+    """
+    prompt = PROMPT_BUILDERS[kind](news_list)
+    return "".join(cached_stream(
+        response_cache, make_key(MODEL_NAME, kind, news_list, client.base_url),
+        lambda: stream_text(client, prompt),
+        force=force
+    ))
+
+# 生成中に表示するセクション名
+SECTION_LABELS = {
+    "title": "📰 記事タイトル",
+    "free": "🆓 無料パート",
+    "paid": "💰 有料パート",
+    "sns": "📣 SNS用要約",
+    "hashtag": "🏷️ ハッシュタグ",
+}
+
+# 記事表示で編集できる欄（セッションのキーは edit_<欄>）
+EDITABLE_FIELDS = ("free", "paid", "sns")
 
 # =========================
 # ページ設定
@@ -46,61 +68,133 @@ st.set_page_config(
 st.title("📝 NOTE記事ジェネレーター")
 st.caption("ニュース選択 → NOTE記事生成（API節約設計）")
 
-# =========================
-# RSS 定義
-# =========================
-RSS_URLS = {
-    "国内": "https://news.yahoo.co.jp/rss/topics/domestic.xml",
-    "経済": "https://news.yahoo.co.jp/rss/topics/business.xml",
-    "IT": "https://news.yahoo.co.jp/rss/topics/it.xml",
-    "科学": "https://news.yahoo.co.jp/rss/topics/science.xml",
-}
-
 # =========================
 # ニュース取得
 # =========================
-@st.cache_data(ttl=600)
-def load_news():
-    items = []
-    for category, url in RSS_URLS.items():
-        feed = feedparser.parse(url)
-        for entry in feed.entries[:5]:
-            items.append({
-                "category": category,
-                "title": entry.title,
-                "summary": getattr(entry, "summary", "（概要なし）")
-            })
-    return items
+@st.cache_resource
+def start_pregenerator():
+    """上位ニュースの記事を事前生成する（PREGEN_TOP_N を指定したときだけ、プロセスで1つ）"""
+    pregenerator = Pregenerator(client, kinds=("note_tagged",))
+    if pregenerator.enabled:
+        news_refresher.add_listener(pregenerator.on_snapshot)
+    return pregenerator
+
+
+start_pregenerator()
+
+# バックグラウンドで定期的に取り直し、ここでは最新のスナップショットを受け取るだけ
+# （通信を待つのはキャッシュも無い初回のみ）
+news_refresher.start()
 
 # =========================
-# STEP 1：ニュース選択
+# 生成結果の保存
 # =========================
-st.subheader("① ニュースを選択")
-
-with st.spinner("ニュース取得中…"):
-    news_list = load_news()
+def set_article(text, key, parsed, warnings):
+    """生成した記事をセッションに保存する
+
+    解析は生成時に1回だけ行い、再実行のたびに parse_article し直さない。
+    編集できる欄の値もここで入れる（以後はユーザーの編集が残る）。
+    """
+    st.session_state["article"] = text
+    st.session_state["article_key"] = key
+    st.session_state["article_parsed"] = parsed
+    st.session_state["article_warnings"] = warnings
+    for field in EDITABLE_FIELDS:
+        st.session_state[f"edit_{field}"] = parsed[field]
+    for kind in EXTRA_KINDS:
+        st.session_state.pop(f"edit_{kind}", None)
+        st.session_state.pop(f"error_{kind}", None)
+
+
+def article_edited():
+    """表示中の記事の編集欄が生成時から書き換えられているか"""
+    parsed = st.session_state.get("article_parsed")
+    if parsed is None:
+        return False
+    return any(
+        st.session_state.get(f"edit_{field}") != parsed[field]
+        for field in EDITABLE_FIELDS
+    )
 
-labels = [
-    f"[{n['category']}] {n['title']}"
-    for n in news_list
-]
 
-selected_labels = st.multiselect(
-    "NOTEに使うニュースを選んでください（複数可）",
-    labels
-)
+def set_extra(kind, future):
+    """追加の種類の生成結果を保存する（失敗したらその種類のエラーとして残す）"""
+    try:
+        st.session_state[f"edit_{kind}"] = future.result()
+    except Exception as e:
+        st.session_state[f"error_{kind}"] = str(e)
 
-selected_news = []
-for label in selected_labels:
-    for n in news_list:
-        if label == f"[{n['category']}] {n['title']}":
-            selected_news.append(n)
-            break
 
 # =========================
-# STEP 2：選択内容確認
+# STEP 1〜3：ニュース選択と生成
 # =========================
-if selected_news:
+# 選択や検索の操作ではこの部分だけを再実行する。記事の表示を変えるときは st.rerun() で全体を更新する
+@st.fragment
+def compose_section():
+    selected_news = select_news()
+    show_selected(selected_news)
+    generation_panel(selected_news)
+
+
+def select_news():
+    st.subheader("① ニュースを選択")
+
+    with st.spinner("ニュース取得中…"), span("streamlit.load_news"):
+        snapshot = news_refresher.latest()
+
+    news_cols = st.columns([5, 1])
+    if snapshot.source == "cache":
+        news_cols[0].caption("前回保存したニュースを表示中（最新のニュースを取得しています）")
+    else:
+        news_cols[0].caption(f"{int(snapshot.age() // 60)} 分前に取得（自動で更新されます）")
+    if news_cols[1].button("🔄 更新"):
+        news_refresher.refresh_now()
+
+    # ID → ニュース（選択肢は ID で持ち、表示名だけ format_func で作る）
+    news_by_id = {n["id"]: n for n in snapshot.items}
+
+    with st.expander("🔎 過去のニュースを検索"):
+        search_cols = st.columns([3, 2, 2, 2])
+        keyword = search_cols[0].text_input("キーワード")
+        category = search_cols[1].selectbox(
+            "カテゴリ", ["すべて"] + news_archive.categories()
+        )
+        since = search_cols[2].date_input("開始日", value=None)
+        until = search_cols[3].date_input("終了日", value=None)
+
+        if keyword or category != "すべて" or since or until:
+            archived = news_archive.search(
+                keyword,
+                category=None if category == "すべて" else category,
+                since=since,
+                until=until,
+            )
+            st.caption(f"{len(archived)} 件見つかりました（下の選択肢に追加されます）")
+            for n in archived:
+                news_by_id.setdefault(n["id"], n)
+
+    # 選択中のニュースは、検索条件や一覧の更新で選択肢が変わっても残す
+    for news_id, news in st.session_state.get("selected_news_by_id", {}).items():
+        news_by_id.setdefault(news_id, news)
+
+    selected_ids = st.multiselect(
+        "NOTEに使うニュースを選んでください（複数可）",
+        list(news_by_id),
+        format_func=lambda news_id: (
+            f"[{news_by_id[news_id]['category']}] {news_by_id[news_id]['title']}"
+        ),
+        key="selected_news_ids",
+    )
+
+    selected_news = [news_by_id[news_id] for news_id in selected_ids]
+    st.session_state["selected_news_by_id"] = {n["id"]: n for n in selected_news}
+    return selected_news
+
+
+def show_selected(selected_news):
+    if not selected_news:
+        return
+
     st.subheader("② 選択中のニュース")
 
     for i, n in enumerate(selected_news, 1):
@@ -109,170 +203,145 @@ if selected_news:
         st.markdown(f"**タイトル**：{n['title']}")
         st.markdown(f"**概要**：{n['summary']}")
 
-# =========================
-# STEP 3：NOTE記事生成
-# =========================
-st.subheader("③ NOTE記事を生成（無料＋有料）")
-
-if selected_news:
-    if st.button("NOTE記事を生成する（無料＋有料）"):
-
-        # ===== ニュースまとめ =====
-        news_text = ""
-        for i, n in enumerate(selected_news, 1):
-            news_text += f"""
-【ニュース{i}】
-カテゴリ：{n['category']}
-タイトル：{n['title']}
-概要：{n['summary']}
-"""
-
-            prompt = f"""
-あなたはNOTEで継続的に収益を上げているプロ編集者です。
-
-以下のニュースを元に、
-「無料部分」と「有料部分」が明確に分かれた
-NOTE向け記事を1本作成してください。
-
-【重要ルール】
-- 煽らない
-- 信頼感のある落ち着いた文体
-- 社会人・ビジネスパーソン向け
-- 専門用語は噛み砕いて説明
-- 有料に価値が集まる構成にする
-- 箇条書き記号（*, -, ・）やMarkdown記法は一切使用しないでください
-- すべて通常の日本語文章（段落）として出力してください
-- 太文字や絵文字など文章をわかりやすく伝える要素は積極的に使用してください
-- 株価への影響については以下のルールで記述してください。
-
-・断定は避ける
-・過去の類似事例を参考にした「想定レンジ」として示す
-・％で表現する
-
-例：
-短期的には+3〜8%程度の上昇が想定される
-ネガティブな場合は-5〜-12%程度の下落リスクがある
 
-- 有料パートでは以下を必ず含めてください。
+def generation_panel(selected_news):
+    st.subheader("③ NOTE記事を生成（無料＋有料）")
+
+    if not selected_news:
+        st.info("ニュースを選択すると有効になります。")
+        return
+
+    if len(selected_news) == 1:
+        # 事前生成済みのニュースなら、ボタンを押さなくてもすぐに表示する
+        # （編集中の記事があるときは置き換えず、読み込むかどうかをボタンで選ばせる）
+        ready_key = make_key(MODEL_NAME, "note_tagged", selected_news, client.base_url)
+        if st.session_state.get("article_key") != ready_key:
+            ready_article = response_cache.get(ready_key)
+            if ready_article is not None and (
+                not article_edited()
+                or st.button("⚡ 生成済みの記事を読み込む（編集中の記事は置き換わります）")
+            ):
+                ready_parser = ArticleStreamParser()
+                ready_parser.feed(ready_article)
+                set_article(ready_article, ready_key, ready_parser.close(), ready_parser.warnings)
+                st.rerun()
+        if st.session_state.get("article_key") == ready_key:
+            st.caption("⚡ このニュースの記事は生成済みです（下に表示しています）")
+
+    force_regenerate = st.checkbox("キャッシュを使わず再生成する")
+    with_extras = st.checkbox("X投稿スレッドと動画台本も同時に生成する")
+
+    if not st.button("NOTE記事を生成する（無料＋有料）"):
+        return
+
+    # ===== プロンプト作成 =====
+    prompt = build_note_tagged_prompt(selected_news)
+    cache_key = make_key(MODEL_NAME, "note_tagged", selected_news, client.base_url)
+    st.caption(prompt_size_text(prompt))
+
+    # ===== X投稿・動画台本（記事と並列に生成） =====
+    extra_futures = {}
+    if with_extras:
+        executor = ThreadPoolExecutor(max_workers=len(EXTRA_KINDS))
+        extra_futures = {
+            kind: executor.submit(
+                generate_cached, kind, selected_news, force_regenerate
+            )
+            for kind in EXTRA_KINDS
+        }
+        executor.shutdown(wait=False)
+
+    # ===== 生成（ストリーミング表示） =====
+    st.caption("NOTE記事を生成中…")
+    # 届いたテキストを逐次解析し、書き込み中のセクションを表示
+    parser = ArticleStreamParser()
+    section_label = st.empty()
+    section_preview = st.empty()
+    chunks = []
+
+    with span("streamlit.generate_article", items=len(selected_news)):
+        for text in cached_stream(
+            response_cache, cache_key,
+            lambda: stream_text(client, prompt),
+            force=force_regenerate
+        ):
+            chunks.append(text)
+            parser.feed(text)
+
+            key = parser.current_key()
+            if key:
+                section_label.caption(f"生成中：{SECTION_LABELS[key]}")
+                section_preview.text(parser.section(key))
+
+    set_article("".join(chunks), cache_key, parser.close(), parser.warnings)
+
+    for kind, future in extra_futures.items():
+        set_extra(kind, future)
+
+    st.session_state["article_notice"] = "記事生成が完了しました！"
+    # 記事の表示部分も更新するため全体を再実行する
+    st.rerun()
+
+
+compose_section()
 
-・短期（1日〜1週間）
-・中期（1〜3か月）
-それぞれの株価影響レンジ（％）
 
+# =========================
+# 記事表示
+# =========================
+# 各欄の編集ではこの部分だけを再実行する（解析済みの記事はセッションから読む）
+@st.fragment
+def article_section():
+    article = st.session_state.get("article_parsed")
+    if article is None:
+        return
 
+    notice = st.session_state.pop("article_notice", None)
+    if notice:
+        st.success(notice)
 
-【文字量の目安】
-- FREE：600〜800文字
-- PAID：800〜1200文字
-
-【出力形式（厳守）】
-以下のタグを必ず使い、順番も変えないこと。
-
-【TITLE】
-記事タイトル（1行）
-
-【FREE】
-・導入
-・ニュースの要点
-・なぜ重要か
-・「続きが読みたい」と思わせるところまで
-
-【PAYWALL】
-ここから先は有料です。
-この続きでは、
-・背景の深掘り
-・本質的な構造
-・今後の展開予測
-・社会人が取るべき具体的アクション
-を解説します。
-
-【PAID】
-・表に出ない背景
-・因果関係の整理
-・中長期的な影響
-・読者が「知れてよかった」と思う視点
-
-【SNS】
-この記事を紹介するSNS用要約（140文字以内）
-
-【HASHTAG】
-この記事に関連するハッシュタグ（5個程度、#付きで）
-
-【ニュース】
-{news_text}
-"""
-
-
-            with st.spinner("NOTE記事を生成中…"):
-                response = model.generate_content(prompt)
-                text = response.text
-
-
-            article = response.text
-            st.session_state["article"] = article
-
-            st.success("記事生成が完了しました！")
-
-else:
-    st.info("ニュースを選択すると有効になります。")
-
-import urllib.parse
-
-if "article" in st.session_state:
-    article = parse_article(st.session_state["article"])
+    for warning in st.session_state.get("article_warnings", []):
+        st.warning(f"出力形式の警告：{warning}")
 
-    # =========================
-    # 記事表示
-    # =========================
     st.subheader("📰 記事タイトル")
     st.code(article["title"], language="text")
 
     st.subheader("🆓 無料パート")
-    st.text_area(
-        label="",
-        value=article["free"],
-        height=300
-    )
+    st.text_area("無料パート", key="edit_free", height=300, label_visibility="collapsed")
 
     st.subheader("💰 有料パート")
-    st.text_area(
-        label="",
-        value=article["paid"],
-        height=300
-    )
+    st.text_area("有料パート", key="edit_paid", height=300, label_visibility="collapsed")
 
     st.subheader("📣 SNS用要約")
-    st.text_area(
-        label="",
-        value=article["sns"],
-        height=120
-    )
+    st.text_area("SNS用要約", key="edit_sns", height=120, label_visibility="collapsed")
 
     st.subheader("🏷️ ハッシュタグ")
     st.code(article["hashtag"], language="text")
 
+    for kind, label in EXTRA_KINDS.items():
+        if f"error_{kind}" in st.session_state:
+            st.error(f"{label}の生成に失敗しました：{st.session_state[f'error_{kind}']}")
+        if f"edit_{kind}" in st.session_state:
+            with st.expander(label):
+                st.text_area(label, key=f"edit_{kind}", height=400, label_visibility="collapsed")
+
     st.divider()
 
     # =========================
-    # NOTE 用 完成本文
+    # NOTE 用 完成本文（編集後の内容から作る）
     # =========================
     st.subheader("📝 NOTE投稿用（そのまま貼り付け）")
 
     note_text = f"""{article["title"]}
 
-{article["free"]}
+{st.session_state["edit_free"]}
 
 ―――
 ※ここから先は有料パートです。
 
-{article["paid"]}
+{st.session_state["edit_paid"]}
 """
-
-    st.text_area(
-        label="",
-        value=note_text,
-        height=450
-    )
+    st.code(note_text, language="text")
 
     # =========================
     # 投稿ボタン
@@ -289,7 +358,7 @@ if "article" in st.session_state:
 
     with col2:
         tweet_text = urllib.parse.quote(
-            article["sns"] + "\n\n" + article["hashtag"]
+            st.session_state["edit_sns"] + "\n\n" + article["hashtag"]
         )
         st.link_button(
             "🐦 Xに投稿する",
@@ -297,24 +366,24 @@ if "article" in st.session_state:
         )
 
 
-
+article_section()
 
 # =========================
-# STEP 4：結果表示
+# パフォーマンス（サイドバー）
 # =========================
-if "article" in st.session_state:
-    st.subheader("④ 生成されたNOTE記事")
-
-    st.text_area(
-        "全文（コピーしてNOTEに貼り付けてください）",
-        st.session_state["article"],
-        height=600
-    )
-
-    st.link_button(
-        "🌐 NOTE投稿ページを開く",
-        "https://note.com/notes/new"
-    )
+@st.fragment
+def perf_panel():
+    st.subheader("⏱ パフォーマンス")
+    st.button("集計を更新", key="perf_refresh")
+    stats = perf_summary()
+    if stats:
+        st.dataframe(stats, hide_index=True, width="stretch")
+    else:
+        st.caption("まだ計測データがありません。")
+
+
+with st.sidebar:
+    perf_panel()
 
 # =========================
 # フッター
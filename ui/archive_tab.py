@@ -0,0 +1,124 @@
+from PySide6.QtWidgets import (
+    QWidget, QLabel, QVBoxLayout, QHBoxLayout, QPushButton,
+    QLineEdit, QComboBox, QDateEdit, QListWidget, QListWidgetItem, QCheckBox
+)
+from PySide6.QtCore import Qt, QDate
+
+from logic.news_archive import default_archive
+from .workers import start_worker
+
+
+class ArchiveTab(QWidget):
+    """過去に取得したニュースを検索し、各タブの一覧に追加する"""
+
+    SEARCH_LIMIT = 100
+
+    def __init__(self, news_store):
+        super().__init__()
+        self.news_store = news_store
+        self.results = []
+
+        layout = QVBoxLayout()
+
+        layout.addWidget(QLabel("過去に取得したニュースをキーワード・カテゴリ・日付で検索できます"))
+
+        # 検索条件
+        form = QHBoxLayout()
+        self.keyword_input = QLineEdit()
+        self.keyword_input.setPlaceholderText("キーワード")
+        self.keyword_input.returnPressed.connect(self.search)
+        form.addWidget(self.keyword_input)
+
+        self.category_box = QComboBox()
+        self.category_box.addItem("すべてのカテゴリ", None)
+        form.addWidget(self.category_box)
+
+        self.date_checkbox = QCheckBox("期間で絞り込む")
+        form.addWidget(self.date_checkbox)
+
+        today = QDate.currentDate()
+        self.since_edit = QDateEdit(today.addDays(-7))
+        self.since_edit.setCalendarPopup(True)
+        form.addWidget(self.since_edit)
+        form.addWidget(QLabel("〜"))
+        self.until_edit = QDateEdit(today)
+        self.until_edit.setCalendarPopup(True)
+        form.addWidget(self.until_edit)
+
+        self.search_button = QPushButton("検索")
+        self.search_button.clicked.connect(self.search)
+        form.addWidget(self.search_button)
+        layout.addLayout(form)
+
+        # 検索結果
+        self.result_list = QListWidget()
+        self.result_list.setSelectionMode(QListWidget.MultiSelection)
+        layout.addWidget(self.result_list)
+
+        self.add_button = QPushButton("選択したニュースを一覧に追加")
+        self.add_button.clicked.connect(self.add_selected)
+        layout.addWidget(self.add_button)
+
+        self.status_label = QLabel("")
+        layout.addWidget(self.status_label)
+
+        self.setLayout(layout)
+
+        self.load_categories()
+
+    def load_categories(self):
+        try:
+            categories = default_archive.categories()
+        except Exception as e:
+            self.status_label.setText(f"アーカイブ読み込みエラー: {e}")
+            return
+        for category in categories:
+            self.category_box.addItem(category, category)
+
+    def search(self):
+        """検索を別スレッドで実行"""
+        keyword = self.keyword_input.text()
+        category = self.category_box.currentData()
+        since = until = None
+        if self.date_checkbox.isChecked():
+            since = self.since_edit.date().toPython()
+            until = self.until_edit.date().toPython()
+
+        self.search_button.setEnabled(False)
+        self.status_label.setText("検索中です…")
+
+        start_worker(
+            lambda worker: default_archive.search(
+                keyword, category=category, since=since, until=until,
+                limit=self.SEARCH_LIMIT
+            ),
+            on_result=self.show_results,
+            on_error=lambda e: self.status_label.setText(f"検索エラー: {e}"),
+            on_finished=lambda: self.search_button.setEnabled(True),
+        )
+
+    def show_results(self, results):
+        """検索結果を一覧に表示（Qt.UserRole は results の index）"""
+        self.results = results
+        self.result_list.clear()
+
+        for index, news in enumerate(results):
+            item = QListWidgetItem(f"[{news['category']}] {news['title']}")
+            item.setData(Qt.UserRole, index)
+            self.result_list.addItem(item)
+
+        self.status_label.setText(f"{len(results)} 件見つかりました。")
+
+    def add_selected(self):
+        selected_news = [
+            self.results[item.data(Qt.UserRole)]
+            for item in self.result_list.selectedItems()
+        ]
+        if not selected_news:
+            self.status_label.setText("ニュースが選択されていません。")
+            return
+
+        self.news_store.add_entries(selected_news)
+        self.status_label.setText(
+            f"{len(selected_news)} 件を各タブの「アーカイブ」に追加しました。"
+        )
@@ -1,22 +1,17 @@
 from PySide6.QtWidgets import QWidget, QLabel, QVBoxLayout, QPushButton, QTextEdit
 from PySide6.QtCore import Qt
 
-import datetime
-import os.path
-
-from google.oauth2.credentials import Credentials
-from google_auth_oauthlib.flow import InstalledAppFlow
-from googleapiclient.discovery import build
-from google.auth.transport.requests import Request
-
-
-SCOPES = ["https://www.googleapis.com/auth/calendar.readonly"]
+from logic.calendar_sync import CalendarSync, event_start
+from .workers import start_worker
 
 
 class CalendarTab(QWidget):
     def __init__(self):
         super().__init__()
 
+        # サービスオブジェクトと予定のキャッシュはタブが持ち続ける
+        self.calendar = CalendarSync()
+
         layout = QVBoxLayout()
 
         self.info_label = QLabel("Google Calendar の予定を取得できます")
@@ -32,48 +27,37 @@ class CalendarTab(QWidget):
 
         self.setLayout(layout)
 
+        # 前回同期した予定があればすぐに表示する
+        if self.calendar.sync_token:
+            self.show_events(self.calendar.upcoming())
+            self.info_label.setText("前回取得した予定を表示しています")
+
     def load_events(self):
-        creds = None
-
-        # token.json があれば再利用
-        if os.path.exists("token.json"):
-            creds = Credentials.from_authorized_user_file("token.json", SCOPES)
-
-        # 認証が必要な場合
-        if not creds or not creds.valid:
-            if creds and creds.expired and creds.refresh_token:
-                creds.refresh(Request())
-            else:
-                flow = InstalledAppFlow.from_client_secrets_file(
-                    "credentials.json", SCOPES
-                )
-                creds = flow.run_local_server(port=0)
-
-            # 認証情報を保存
-            with open("token.json", "w") as token:
-                token.write(creds.to_json())
-
-        # Calendar API に接続
-        service = build("calendar", "v3", credentials=creds)
-
-        # 今日〜7日後までの予定を取得
-        now = datetime.datetime.utcnow().isoformat() + "Z"
-        week_later = (datetime.datetime.utcnow() + datetime.timedelta(days=7)).isoformat() + "Z"
-
-        events_result = (
-            service.events()
-            .list(
-                calendarId="primary",
-                timeMin=now,
-                timeMax=week_later,
-                singleEvents=True,
-                orderBy="startTime",
-            )
-            .execute()
+        """キャッシュを表示してから、差分同期を別スレッドで実行"""
+        self.button.setEnabled(False)
+        if self.calendar.sync_token:
+            self.show_events(self.calendar.upcoming())
+            self.info_label.setText("予定の変更を確認中です…")
+        else:
+            self.result_box.setText("予定を取得中です…")
+
+        start_worker(
+            self.sync_events,
+            on_result=self.on_synced,
+            on_error=lambda e: self.info_label.setText(f"予定取得エラー: {e}"),
+            on_finished=lambda: self.button.setEnabled(True),
         )
 
-        events = events_result.get("items", [])
+    def sync_events(self, worker):
+        changed = self.calendar.sync()
+        return changed, self.calendar.upcoming()
+
+    def on_synced(self, result):
+        changed, events = result
+        self.show_events(events)
+        self.info_label.setText(f"予定を更新しました（変更 {changed} 件）")
 
+    def show_events(self, events):
         # 表示
         if not events:
             self.result_box.setText("今後1週間の予定はありません。")
@@ -81,8 +65,8 @@ class CalendarTab(QWidget):
 
         text = ""
         for event in events:
-            start = event["start"].get("dateTime", event["start"].get("date"))
+            start = event_start(event)
             summary = event.get("summary", "（タイトルなし）")
             text += f"{start} : {summary}\n"
 
-        self.result_box.setText(text)
\ No newline at end of file
+        self.result_box.setText(text)
@@ -1,10 +1,23 @@
-from PySide6.QtWidgets import QMainWindow, QTabWidget
+from PySide6.QtWidgets import QMainWindow, QTabWidget, QVBoxLayout, QWidget
 
-from .calendar_tab import CalendarTab
-from .news_tab import NewsTab
-from .youtube_tab import YouTubeTab
-from .x_tab import XTab
-from .note_tab import NoteTab   # 追加
+from .news_store import NewsStore
+
+
+class LazyTab(QWidget):
+    """初めて表示されたときに中身のタブを作るプレースホルダー"""
+
+    def __init__(self, factory):
+        super().__init__()
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        self.factory = factory
+        self.widget = None
+
+    def ensure(self):
+        if self.widget is None:
+            self.widget = self.factory()
+            self.layout().addWidget(self.widget)
+        return self.widget
 
 
 class MainWindow(QMainWindow):
@@ -14,11 +27,98 @@ class MainWindow(QMainWindow):
         self.setWindowTitle("My Automation App")
         self.setMinimumSize(900, 600)
 
-        tabs = QTabWidget()
-        tabs.addTab(CalendarTab(), "Google Calendar")
-        tabs.addTab(NewsTab(), "News → Script")
-        tabs.addTab(NoteTab(), "NOTE 記事生成")   # 追加
-        tabs.addTab(XTab(), "X Post")
-        tabs.addTab(YouTubeTab(), "YouTube Upload")
+        # ニュースはアプリ全体で1回だけ取得し、各タブで共有する
+        self.news_store = NewsStore(self)
+
+        # 上位ニュースの記事の事前生成（PREGEN_TOP_N を指定したときだけ）
+        self.pregenerator = None
+        self.news_store.updated.connect(self.schedule_pregeneration)
+
+        # 各タブ（と重いライブラリの import）は初めて開いたときに作る
+        self.tabs = QTabWidget()
+        self.lazy_tabs = {}
+        self.add_lazy_tab("calendar", "Google Calendar", self.create_calendar_tab)
+        self.add_lazy_tab("news", "News → Script", self.create_news_tab)
+        self.add_lazy_tab("note", "NOTE 記事生成", self.create_note_tab)   # 追加
+        self.add_lazy_tab("x", "X Post", self.create_x_tab)
+        self.add_lazy_tab("archive", "ニュース検索", self.create_archive_tab)
+        self.add_lazy_tab("perf", "パフォーマンス", self.create_perf_tab)
+        self.add_lazy_tab("youtube", "YouTube Upload", self.create_youtube_tab)
+
+        self.tabs.currentChanged.connect(
+            lambda index: self.tabs.widget(index).ensure()
+        )
+        self.tabs.currentWidget().ensure()
+
+        self.setCentralWidget(self.tabs)
+
+    def add_lazy_tab(self, key, label, factory):
+        lazy = LazyTab(factory)
+        self.lazy_tabs[key] = lazy
+        self.tabs.addTab(lazy, label)
+
+    def tab(self, key):
+        """タブを返す（まだ作られていなければここで作る）"""
+        return self.lazy_tabs[key].ensure()
+
+    # ===== タブの生成 =====
+    def create_calendar_tab(self):
+        from .calendar_tab import CalendarTab
+        return CalendarTab()
+
+    def create_news_tab(self):
+        from .news_tab import NewsTab
+        return NewsTab(self.news_store)
+
+    def create_note_tab(self):
+        from .note_tab import NoteTab
+        note_tab = NoteTab(self.news_store)
+
+        # NOTEタブでまとめて生成した X 投稿・動画台本を各タブに表示
+        note_tab.bundle_started.connect(self.clear_bundle_tabs)
+        note_tab.bundle_progress.connect(self.dispatch_bundle_chunk)
+        return note_tab
+
+    def create_x_tab(self):
+        from .x_tab import XTab
+        return XTab(self.news_store)
+
+    def create_archive_tab(self):
+        from .archive_tab import ArchiveTab
+        return ArchiveTab(self.news_store)
+
+    def create_perf_tab(self):
+        from .perf_tab import PerfTab
+        return PerfTab()
+
+    def create_youtube_tab(self):
+        from .youtube_tab import YouTubeTab
+        return YouTubeTab()
+
+    # ===== 事前生成 =====
+    def schedule_pregeneration(self):
+        from logic.pregenerate import PREGEN_TOP_N, Pregenerator
+
+        if PREGEN_TOP_N <= 0:
+            return
+        if self.pregenerator is None:
+            from logic.gemini_client import get_client
+
+            # NOTEタブの記事と、X投稿（まとめて生成・Xタブで使う）を先に作っておく
+            self.pregenerator = Pregenerator(get_client(), kinds=("note_article", "x_thread"))
+
+        self.pregenerator.schedule({
+            category: [self.news_store.entries[news_id] for news_id in ids]
+            for category, ids in self.news_store.by_category.items()
+        })
+
+    # ===== まとめて生成の結果を配る =====
+    def clear_bundle_tabs(self):
+        self.tab("x").result_box.clear()
+        self.tab("news").result_box.clear()
 
-        self.setCentralWidget(tabs)
+    def dispatch_bundle_chunk(self, kind, text):
+        if kind == "x_thread":
+            self.tab("x").append_text(text)
+        elif kind == "video_script":
+            self.tab("news").append_text(text)
@@ -0,0 +1,90 @@
+"""共有ニュースストアの一覧を表示するタブの共通処理
+
+NewsTab / NoteTab / XTab はどれも同じ形で NewsStore の一覧を表示する。
+タブ側は news_store・news_list・load_button・status_label を作ってから
+connect_news_store() を呼ぶ。タブごとに違うのは DISPLAY_LIMIT と
+計測名（PERF_NAME）だけ。アーカイブから追加したニュースは件数で切らない。
+"""
+
+from PySide6.QtCore import Qt
+from PySide6.QtWidgets import QListWidgetItem
+
+from logic.perf import span
+
+from .news_store import ARCHIVE_CATEGORY
+
+
+class NewsListMixin:
+    DISPLAY_LIMIT = 5      # カテゴリごとの表示件数
+    PERF_NAME = "tab"      # 計測名は ui.<PERF_NAME>.show_news
+
+    def connect_news_store(self):
+        """共有ニュースストアの更新を受け取る"""
+        self.news_store.loading.connect(self.on_news_loading)
+        self.news_store.updated.connect(self.show_news)
+        self.news_store.failed.connect(
+            lambda e: self.status_label.setText(f"ニュース取得エラー: {e}")
+        )
+        self.news_store.finished.connect(self.on_news_finished)
+        if self.news_store.entries:
+            self.show_news()
+        if self.news_store.is_loading():
+            self.on_news_loading()
+
+    def load_news(self):
+        """共有ニュースストアに再取得を依頼（結果は show_news で全タブに反映）"""
+        self.news_store.refresh()
+
+    def on_news_loading(self):
+        self.load_button.setEnabled(False)
+        self.status_label.setText("ニュースを取得中です…")
+
+    def on_news_finished(self):
+        self.load_button.setEnabled(True)
+
+    def show_news(self):
+        """ストアのニュースを一覧に表示（Qt.UserRole はニュースの ID）"""
+        with span(f"ui.{self.PERF_NAME}.show_news", items=len(self.news_store.entries)):
+            self._fill_news_list()
+
+        self.status_label.setText("ニュースを読み込みました。")
+
+    def _fill_news_list(self):
+        # 作り直しても選択中のニュースは選択したままにする（一覧の ID で戻す）
+        selected_ids = {
+            item.data(Qt.UserRole) for item in self.news_list.selectedItems()
+        }
+        self.news_list.blockSignals(True)
+        try:
+            self._add_news_items(selected_ids)
+        finally:
+            self.news_list.blockSignals(False)
+
+    def _add_news_items(self, selected_ids):
+        self.news_list.clear()
+
+        for category, ids in self.news_store.by_category.items():
+            # カテゴリ見出し（選択不可）
+            header = QListWidgetItem(f"=== {category} ===")
+            header.setFlags(header.flags() & ~Qt.ItemIsSelectable)
+            self.news_list.addItem(header)
+
+            # アーカイブ検索から追加したものは件数で切らずにすべて表示する
+            if category != ARCHIVE_CATEGORY:
+                ids = ids[:self.DISPLAY_LIMIT]
+            for news_id in ids:
+                news = self.news_store.entries[news_id]
+                item = QListWidgetItem(f"[{news['category']}] {news['title']}")
+                item.setData(Qt.UserRole, news_id)
+                self.news_list.addItem(item)
+                if news_id in selected_ids:
+                    item.setSelected(True)
+
+    def selected_news(self):
+        """選択中のニュース（見出し行は除く）"""
+        selected_news = []
+        for item in self.news_list.selectedItems():
+            news_id = item.data(Qt.UserRole)
+            if news_id is not None:
+                selected_news.append(self.news_store.entries[news_id])
+        return selected_news
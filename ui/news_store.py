@@ -0,0 +1,88 @@
+"""アプリ全体で共有するニュース一覧
+
+MainWindow が1つだけ持ち、各タブに渡す。RSS の取得は1回だけ行い、
+新しいデータが届いたら updated シグナルで全タブに知らせる。
+タブ側は一覧の選択状態だけを持つ。
+ニュースは RSS の GUID / リンクから作った安定 ID で管理するため、
+再取得やアーカイブからの追加をしても同じ記事は同じ ID のまま。
+"""
+
+from PySide6.QtCore import QObject, Signal
+
+from .workers import start_worker
+
+
+# タブの中で一番多く表示する件数（NewsTab の 10 件）に合わせて取得する
+FETCH_LIMIT = 10
+
+# アーカイブ検索から一覧に追加したニュースの見出し
+ARCHIVE_CATEGORY = "アーカイブ"
+
+
+class NewsStore(QObject):
+    loading = Signal()
+    updated = Signal()
+    failed = Signal(str)
+    finished = Signal()
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.entries = {}            # {ID: ニュース}（一覧の Qt.UserRole はこの ID）
+        self.by_category = {}        # {カテゴリ: [ID, ...]}
+        self._worker = None
+
+    def is_loading(self):
+        return self._worker is not None
+
+    def refresh(self):
+        """ニュースを再取得する（取得中なら何もしない）"""
+        if self._worker is not None:
+            return
+
+        self.loading.emit()
+        self._worker = start_worker(
+            self._fetch,
+            on_result=self._set_news,
+            on_error=self.failed.emit,
+            on_finished=self._finish,
+        )
+
+    @staticmethod
+    def _fetch(worker):
+        # feedparser / requests は起動時に読み込まず、初回取得時に import する
+        from logic.news_fetch import fetch_news
+
+        return fetch_news(limit=FETCH_LIMIT)
+
+    def add_entries(self, news_list, category=ARCHIVE_CATEGORY):
+        """アーカイブ検索の結果などを一覧に追加する（同じ ID は追加しない）"""
+        ids = self.by_category.setdefault(category, [])
+        for news in news_list:
+            if news["id"] not in self.entries:
+                self.entries[news["id"]] = news
+            if news["id"] not in ids:
+                ids.append(news["id"])
+
+        self.updated.emit()
+
+    def _set_news(self, news_by_category):
+        # アーカイブから追加したニュースは再取得後も残す
+        archived = self.by_category.get(ARCHIVE_CATEGORY, [])
+        entries = {news_id: self.entries[news_id] for news_id in archived}
+
+        self.by_category = {}
+        for category, news_list in news_by_category.items():
+            ids = []
+            for news in news_list:
+                entries.setdefault(news["id"], news)
+                ids.append(news["id"])
+            self.by_category[category] = ids
+        if archived:
+            self.by_category[ARCHIVE_CATEGORY] = archived
+        self.entries = entries
+
+        self.updated.emit()
+
+    def _finish(self):
+        self._worker = None
+        self.finished.emit()
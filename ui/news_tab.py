@@ -1,28 +1,38 @@
+import os
+
 from PySide6.QtWidgets import (
     QWidget, QLabel, QVBoxLayout, QPushButton,
-    QTextEdit, QListWidget, QListWidgetItem
+    QTextEdit, QListWidget, QCheckBox
 )
-from PySide6.QtCore import Qt
-import feedparser
-from dotenv import load_dotenv
-import os
+from PySide6.QtGui import QTextCursor
+
+from logic.gemini import MODEL_NAME
+from logic.gemini_client import get_client
+from logic.prompts import build_video_script_prompt, prompt_size_text
+from logic.response_cache import make_key
+from .news_list import NewsListMixin
+from .workers import start_worker, stream_generation
 
-from google import genai
 
+class NewsTab(NewsListMixin, QWidget):
+    DISPLAY_LIMIT = 10  # カテゴリごとの表示件数
+    PERF_NAME = "news_tab"
 
-class NewsTab(QWidget):
-    def __init__(self):
+    def __init__(self, news_store):
         super().__init__()
 
-        load_dotenv()
-        api_key = os.getenv("GEMINI_API_KEY")
-        self.client = genai.Client(api_key=api_key)
+        self.news_store = news_store
+
+        self.client = get_client()
 
         layout = QVBoxLayout()
 
         self.info_label = QLabel("ニュース一覧 → 選択 → Gemini 台本生成")
         layout.addWidget(self.info_label)
 
+        self.status_label = QLabel("")
+        layout.addWidget(self.status_label)
+
         self.news_list = QListWidget()
         self.news_list.setSelectionMode(QListWidget.MultiSelection)
         layout.addWidget(self.news_list)
@@ -35,135 +45,104 @@ class NewsTab(QWidget):
         self.script_button.clicked.connect(self.generate_script)
         layout.addWidget(self.script_button)
 
+        self.force_checkbox = QCheckBox("キャッシュを使わず再生成する")
+        layout.addWidget(self.force_checkbox)
+
+        self.cancel_button = QPushButton("生成を中止")
+        self.cancel_button.setEnabled(False)
+        self.cancel_button.clicked.connect(self.cancel_generation)
+        layout.addWidget(self.cancel_button)
+
         self.result_box = QTextEdit()
         self.result_box.setReadOnly(True)
         layout.addWidget(self.result_box)
 
-        self.setLayout(layout)
-
-        self.news_entries = []
-
-
-    def load_news(self):
-        """国内・経済・IT・科学のニュースをカテゴリごとに10件ずつ取得"""
-
-        rss_urls = [
-            ("国内", "https://news.yahoo.co.jp/rss/topics/domestic.xml"),
-            ("経済", "https://news.yahoo.co.jp/rss/topics/business.xml"),
-            ("IT", "https://news.yahoo.co.jp/rss/topics/it.xml"),
-            ("科学", "https://news.yahoo.co.jp/rss/topics/science.xml"),
-        ]
-
-        self.news_list.clear()
-        self.news_entries = []
-
-        for category, url in rss_urls:
-
-            # 見出し（選択不可）
-            header = QListWidgetItem(f"=== {category} ===")
-            header.setFlags(header.flags() & ~Qt.ItemIsSelectable)
-            self.news_list.addItem(header)
+        self.audio_button = QPushButton("台本を音声にする（MP3）")
+        self.audio_button.clicked.connect(self.generate_audio)
+        layout.addWidget(self.audio_button)
 
-            feed = feedparser.parse(url)
-            entries = feed.entries[:10]
-
-            for entry in entries:
-                title = entry.title
-                summary = getattr(entry, "summary", None)
-                if summary is None:
-                    summary = getattr(entry, "description", "（概要なし）")
-
-                # news_entries に追加
-                index = len(self.news_entries)
-                self.news_entries.append({
-                    "category": category,
-                    "title": title,
-                    "summary": summary
-                })
-
-                # ListWidgetItem に index を埋め込む
-                item = QListWidgetItem(f"[{category}] {title}")
-                item.setData(Qt.UserRole, index)
-                self.news_list.addItem(item)
+        self.setLayout(layout)
 
-        self.result_box.setText("カテゴリ別ニュースを読み込みました。")
+        self.generate_worker = None
 
+        # 共有ニュースストアの更新を受け取る
+        self.connect_news_store()
 
     def generate_script(self):
         """選択したニュースをまとめて台本生成"""
 
-        selected_items = self.news_list.selectedItems()
+        selected_news = self.selected_news()
 
-        if not selected_items:
+        if not selected_news:
             self.result_box.setText("ニュースが選択されていません。")
             return
 
-        selected_news = []
+        # Gemini に渡す文章を作成
+        prompt = build_video_script_prompt(selected_news)
+        cache_key = make_key(MODEL_NAME, "video_script", selected_news, self.client.base_url)
+
+        # 別スレッドで生成し、届いた分から順に表示する
+        self.result_box.clear()
+        self.status_label.setText(f"動画台本を生成中です…（{prompt_size_text(prompt)}）")
+        self.script_button.setEnabled(False)
+        self.cancel_button.setEnabled(True)
+
+        self.generate_worker = start_worker(
+            stream_generation, self.client, prompt,
+            cache_key=cache_key,
+            force=self.force_checkbox.isChecked(),
+            on_progress=self.append_text,
+            on_result=lambda text: self.status_label.setText("生成が完了しました。"),
+            on_error=lambda e: self.result_box.append(f"\n生成エラー: {e}"),
+            on_cancelled=lambda: self.result_box.append("\n（生成を中止しました）"),
+            on_finished=self.finish_generation,
+        )
 
-        for item in selected_items:
-            index = item.data(Qt.UserRole)
-            if index is None:
-                continue  # 見出し行はスキップ
-            selected_news.append(self.news_entries[index])
+    def append_text(self, text):
+        self.result_box.moveCursor(QTextCursor.End)
+        self.result_box.insertPlainText(text)
 
-        if not selected_news:
-            self.result_box.setText("ニュースが選択されていません。")
+    def cancel_generation(self):
+        if self.generate_worker:
+            self.generate_worker.cancel()
+
+    def finish_generation(self):
+        self.generate_worker = None
+        self.script_button.setEnabled(True)
+        self.cancel_button.setEnabled(False)
+
+    # ===== 台本の音声化 =====
+    def generate_audio(self):
+        script = self.result_box.toPlainText().strip()
+        if not script or self.generate_worker:
+            self.status_label.setText("先に台本を生成してください。")
             return
 
-        # Gemini に渡す文章を作成
-        news_text = ""
-        for i, news in enumerate(selected_news, start=1):
-            news_text += f"【ニュース{i}】\nタイトル: {news['title']}\n概要: {news['summary']}\n\n"
-
-        prompt = f"""
-あなたは「デイリーニュースCFO マーク」というキャラクターとして話します。
-
-【キャラクター設定】
-- 年齢：38歳の男性
-- 職業：企業のCFO（Chief Friendly Officer）
-- 経歴：元コンサル、元新聞社の経済部記者、現在は経営企画室で働く社会人
-- 性格：落ち着いていて論理的、視聴者に寄り添う、事実ベースで淡々と説明
-- 話し方：丁寧で落ち着いたテンポ、語尾は「〜です」「〜ですね」
-- 口癖：「今日も3分で、あなたの情報武装をお手伝いします」「ポイントを簡潔に整理しますね」
-- 禁止事項：キャラを変えない、口調を変えない、若者言葉を使わない、感情的にならない、他のキャラを登場させない
-
-【見た目】
-- 黒髪の短髪、細いフレームの眼鏡
-- ネイビーのスーツ、白シャツ、落ち着いた色のネクタイ
-- 穏やかな目元で、落ち着いた雰囲気
-- 声は低めで聞き取りやすい
-
-【冒頭の挨拶】
-必ず次の文言から始めてください：
-「デイリーニュースCFOのマークです。今日も3分で、あなたの情報武装をお手伝いします。」
-
-【構成テンプレート】
-1. 導入（20秒）
-    - 固定挨拶
-    - 今日扱うニュースの概要
-    - 視聴者のメリット提示
-
-2. 本編（100〜130秒）
-    ニュースごとに以下を説明：
-    - 要点（30文字以内）
-    - 背景（なぜ起きたのか）
-    - 社会人にとっての影響（ビジネス視点）
-    - 今後どうなるか（短期予測）
-
-3. まとめ（30秒）
-    - 今日のポイントを3つに整理
-    - 明日へのアクションを一言
-    - 固定の締めの挨拶
-
-【対象ニュース】
-{news_text}
-
-全体で150〜180秒程度のスクリプトにまとめてください。
-"""
-
-        response = self.client.models.generate_content(
-            model="gemini-2.5-flash",
-            contents=prompt
+        self.audio_button.setEnabled(False)
+        self.status_label.setText("音声を生成中です…")
+
+        start_worker(
+            synthesize_audio_job, script,
+            on_progress=lambda p: self.status_label.setText(
+                f"音声を生成中です…（{p[0]}/{p[1]}）"
+            ),
+            on_result=lambda stats: self.status_label.setText(
+                f"{AUDIO_OUTPUT_PATH} を生成しました"
+                f"（新規合成 {stats['synthesized']} / キャッシュ {stats['cached']}）"
+            ),
+            on_error=lambda e: self.status_label.setText(f"音声生成エラー: {e}"),
+            on_finished=lambda: self.audio_button.setEnabled(True),
         )
 
-        self.result_box.setText(response.text)
\ No newline at end of file
+
+AUDIO_OUTPUT_PATH = os.path.join("output", "script.mp3")
+
+
+def synthesize_audio_job(worker, script):
+    # Text-to-Speech は音声化を使うときだけ読み込む
+    from logic.tts import save_script_audio
+
+    return save_script_audio(
+        script, AUDIO_OUTPUT_PATH,
+        on_progress=lambda done, total: worker.report((done, total)),
+    )
@@ -1,26 +1,38 @@
 from PySide6.QtWidgets import (
     QWidget, QVBoxLayout, QLabel,
-    QPushButton, QTextEdit, QListWidget, QListWidgetItem,
-    QApplication, QHBoxLayout
+    QPushButton, QTextEdit, QListWidget,
+    QApplication, QHBoxLayout, QCheckBox
 )
-from PySide6.QtCore import Qt
-import feedparser
-from dotenv import load_dotenv
+from PySide6.QtCore import Signal
+from PySide6.QtGui import QTextCursor
 import os
 import webbrowser
-from google import genai
-from PIL import Image, ImageDraw, ImageFont
-from datetime import datetime
 
+from logic.article_parser import ArticleStreamParser, NOTE_ARTICLE_SECTIONS
+from logic.gemini import MODEL_NAME
+from logic.gemini_client import get_client
+from logic.perf import span
+from logic.prompts import build_note_article_prompt, prompt_size_text
+from logic.response_cache import default_cache, make_key
+from .news_list import NewsListMixin
+from .workers import bundle_generation, start_worker, stream_generation
 
-class NoteTab(QWidget):
-    def __init__(self):
+
+class NoteTab(NewsListMixin, QWidget):
+    DISPLAY_LIMIT = 5  # カテゴリごとの表示件数
+    PERF_NAME = "note_tab"
+
+    # まとめて生成したときに X / 台本タブへ結果を渡すためのシグナル
+    bundle_started = Signal()
+    bundle_progress = Signal(str, str)   # (種別, テキスト片)
+
+    def __init__(self, news_store):
         super().__init__()
 
+        self.news_store = news_store
+
         # ===== Gemini 初期化 =====
-        load_dotenv()
-        api_key = os.getenv("GEMINI_API_KEY")
-        self.client = genai.Client(api_key=api_key)
+        self.client = get_client()
 
         layout = QVBoxLayout()
 
@@ -35,6 +47,7 @@ class NoteTab(QWidget):
         # ===== ニュース一覧 =====
         self.news_list = QListWidget()
         self.news_list.setSelectionMode(QListWidget.MultiSelection)
+        self.news_list.itemSelectionChanged.connect(self.show_pregenerated)
         layout.addWidget(self.news_list)
 
         self.load_button = QPushButton("ニュースを読み込む")
@@ -45,6 +58,24 @@ class NoteTab(QWidget):
         self.generate_button.clicked.connect(self.generate_note_article)
         layout.addWidget(self.generate_button)
 
+        self.bundle_button = QPushButton("NOTE記事・X投稿・動画台本をまとめて生成")
+        self.bundle_button.clicked.connect(self.generate_bundle)
+        layout.addWidget(self.bundle_button)
+
+        self.force_checkbox = QCheckBox("キャッシュを使わず再生成する")
+        layout.addWidget(self.force_checkbox)
+
+        self.cancel_button = QPushButton("生成を中止")
+        self.cancel_button.setEnabled(False)
+        self.cancel_button.clicked.connect(self.cancel_generation)
+        layout.addWidget(self.cancel_button)
+
+        # 編集中の記事があるときだけ、事前生成済みの記事を読み込むかどうかをこのボタンで選ぶ
+        self.load_ready_button = QPushButton("生成済みの記事を読み込む（編集中の記事は置き換わります）")
+        self.load_ready_button.clicked.connect(self.load_pregenerated)
+        self.load_ready_button.hide()
+        layout.addWidget(self.load_ready_button)
+
         # ===== 結果表示 =====
         self.result_box = QTextEdit()
         layout.addWidget(self.result_box)
@@ -72,40 +103,52 @@ class NoteTab(QWidget):
 
         self.setLayout(layout)
 
-        self.news_entries = []
         self.generated_title = ""
         self.generated_body = ""
+        self.shown_article = ""      # show_article で表示した内容（編集の有無の判定用）
+        self.ready_article = None    # 読み込み待ちの事前生成済みの記事
+        self.generate_worker = None
+
+        # 共有ニュースストアの更新を受け取る
+        self.connect_news_store()
+
+    # ===== 事前生成済みの記事 =====
+    def show_pregenerated(self):
+        """1件だけ選んだニュースの記事が事前生成済みなら、すぐに表示する
+
+        表示中の記事を編集しているときは置き換えず、読み込みボタンを出す。
+        """
+        self.ready_article = None
+        self.load_ready_button.hide()
+        if self.generate_worker is not None:
+            return
+        selected_news = self.selected_news()
+        if len(selected_news) != 1:
+            return
+
+        text = default_cache.get(make_key(MODEL_NAME, "note_article", selected_news, self.client.base_url))
+        if text is None:
+            return
+        if self.article_edited():
+            self.ready_article = text
+            self.load_ready_button.show()
+            self.status_label.setText("このニュースの記事は事前生成済みです。ボタンを押すと表示します。")
+            return
+
+        self.show_article(text)
+        self.status_label.setText("事前生成済みの記事を表示しました。コピーしてNOTEに投稿できます。")
 
-    # ===== ニュース取得 =====
-    def load_news(self):
-        rss_urls = [
-            ("国内", "https://news.yahoo.co.jp/rss/topics/domestic.xml"),
-            ("経済", "https://news.yahoo.co.jp/rss/topics/business.xml"),
-            ("IT", "https://news.yahoo.co.jp/rss/topics/it.xml"),
-            ("科学", "https://news.yahoo.co.jp/rss/topics/science.xml"),
-        ]
-
-        self.news_list.clear()
-        self.news_entries = []
-
-        for category, url in rss_urls:
-            header = QListWidgetItem(f"=== {category} ===")
-            header.setFlags(header.flags() & ~Qt.ItemIsSelectable)
-            self.news_list.addItem(header)
-
-            feed = feedparser.parse(url)
-            for entry in feed.entries[:5]:
-                index = len(self.news_entries)
-                self.news_entries.append({
-                    "title": entry.title,
-                    "summary": getattr(entry, "summary", "（概要なし）")
-                })
-
-                item = QListWidgetItem(f"[{category}] {entry.title}")
-                item.setData(Qt.UserRole, index)
-                self.news_list.addItem(item)
-
-        self.result_box.setText("ニュースを読み込みました。")
+    def load_pregenerated(self):
+        """読み込み待ちにしていた事前生成済みの記事を表示する"""
+        text, self.ready_article = self.ready_article, None
+        self.load_ready_button.hide()
+        if text is not None:
+            self.show_article(text)
+            self.status_label.setText("事前生成済みの記事を表示しました。コピーしてNOTEに投稿できます。")
+
+    def article_edited(self):
+        """表示中の記事が表示したときから書き換えられているか"""
+        return bool(self.shown_article) and self.result_box.toPlainText() != self.shown_article
 
     # ===== NOTE記事生成 =====
     def generate_note_article(self):
@@ -114,87 +157,117 @@ class NoteTab(QWidget):
             self.result_box.setText("ニュースが選択されていません。")
             return
 
-        self.status_label.setText("NOTE記事を生成中です…")
-        self.generate_button.setEnabled(False)
-        QApplication.setOverrideCursor(Qt.WaitCursor)
-        QApplication.processEvents()
-
-        try:
-            selected_news = []
-            for item in selected_items:
-                index = item.data(Qt.UserRole)
-                if index is not None:
-                    selected_news.append(self.news_entries[index])
-
-            news_text = ""
-            for i, news in enumerate(selected_news, start=1):
-                news_text += (
-                    f"【ニュース{i}】\n"
-                    f"タイトル: {news['title']}\n"
-                    f"概要: {news['summary']}\n\n"
-                )
-
-            prompt = f"""
-あなたはNOTEで収益化を目的としたプロの編集者です。
-
-以下のニュースを元に、
-NOTE用の記事を書いてください。
-
-【構成ルール】
-必ず次の構成で出力してください。
-
---------------------------------
-【タイトル】
-（NOTE向け・知的・煽らない）
-
-【無料公開部分】
-・導入
-・ニュースの要点整理
-・背景の解説
-・ここまででも「読んでよかった」と思える内容
-
-【ここから有料】
-※この見出しを必ず入れる
-
-【有料部分】
-・一歩踏み込んだ考察
-・ニュースの裏にある構造
-・今後どうなりそうか
-・社会人が取るべき視点や行動
---------------------------------
-
-【条件】
-・落ち着いた知的な文体
-・煽らない
-・断定しすぎない
-・ニュース解説＋考察型
-・全体で1500〜2000文字程度
-
-【ニュース】
-{news_text}
-
-"""
-
-            response = self.client.models.generate_content(
-                model="gemini-2.5-flash",
-                contents=prompt
-            )
+        selected_news = self.selected_news()
+        prompt = build_note_article_prompt(selected_news)
+        cache_key = make_key(MODEL_NAME, "note_article", selected_news, self.client.base_url)
+
+        self.status_label.setText(f"NOTE記事を生成中です…（{prompt_size_text(prompt)}）")
+        self.start_generation()
+
+        # 別スレッドで生成し、届いた分から順に表示する
+        self.generate_worker = start_worker(
+            stream_generation, self.client, prompt,
+            cache_key=cache_key,
+            force=self.force_checkbox.isChecked(),
+            on_progress=self.append_text,
+            on_result=self.show_article,
+            on_error=lambda e: self.status_label.setText(f"生成エラー: {e}"),
+            on_cancelled=lambda: self.status_label.setText("生成を中止しました。"),
+            on_finished=self.finish_generation,
+        )
 
-            text = response.text.strip()
+    def generate_bundle(self):
+        """NOTE記事・X投稿・動画台本を1回の選択から並列生成"""
+        selected_items = self.news_list.selectedItems()
+        if not selected_items:
+            self.result_box.setText("ニュースが選択されていません。")
+            return
 
-            # ===== タイトルと本文を分離 =====
-            lines = text.splitlines()
-            self.generated_title = lines[0].replace("【タイトル】", "").strip()
-            self.generated_body = "\n".join(lines[1:]).replace("【本文】", "").strip()
+        selected_news = self.selected_news()
+
+        self.status_label.setText("NOTE記事・X投稿・動画台本を生成中です…")
+        self.start_generation()
+        self.bundle_started.emit()
+
+        self.generate_worker = start_worker(
+            bundle_generation, self.client, selected_news,
+            force=self.force_checkbox.isChecked(),
+            on_progress=self.dispatch_bundle_chunk,
+            on_result=self.show_bundle,
+            on_error=lambda e: self.status_label.setText(f"生成エラー: {e}"),
+            on_cancelled=lambda: self.status_label.setText("生成を中止しました。"),
+            on_finished=self.finish_generation,
+        )
 
-            self.result_box.setText(
-                f"【タイトル】\n{self.generated_title}\n\n{self.generated_body}"
+    def show_bundle(self, bundle):
+        """まとめて生成の結果を表示し、失敗した種別を知らせる"""
+        results, errors = bundle
+        if "note_article" in results:
+            self.show_article(results["note_article"])
+        if errors:
+            labels = {"note_article": "NOTE記事", "x_thread": "X投稿", "video_script": "動画台本"}
+            failed = " / ".join(f"{labels.get(kind, kind)}: {e}" for kind, e in errors.items())
+            self.status_label.setText(f"一部の生成に失敗しました（{failed}）")
+
+    def dispatch_bundle_chunk(self, chunk):
+        kind, text = chunk
+        if kind == "note_article":
+            self.append_text(text)
+        else:
+            self.bundle_progress.emit(kind, text)
+
+    def start_generation(self):
+        self.generate_button.setEnabled(False)
+        self.bundle_button.setEnabled(False)
+        self.cancel_button.setEnabled(True)
+        self.ready_article = None
+        self.load_ready_button.hide()
+        self.shown_article = ""
+        self.result_box.clear()
+
+    def append_text(self, text):
+        self.result_box.moveCursor(QTextCursor.End)
+        self.result_box.insertPlainText(text)
+
+    def show_article(self, text):
+        text = text.strip()
+
+        # ===== タイトルと本文を分離 =====
+        with span("ui.note_tab.parse_article", chars=len(text)):
+            parser = ArticleStreamParser(NOTE_ARTICLE_SECTIONS)
+            parser.feed(text)
+            article = parser.close()
+
+        if article["title"] and (article["free"] or article["paid"]):
+            self.generated_title = article["title"]
+            self.generated_body = (
+                f"{article['free']}\n\n"
+                "―――\n※ここから先は有料パートです。\n\n"
+                f"{article['paid']}"
             )
+        else:
+            # タグが揃っていない場合は1行目をタイトルとして扱う
+            lines = text.splitlines()
+            self.generated_title = lines[0].replace("【タイトル】", "").strip() if lines else ""
+            self.generated_body = "\n".join(lines[1:]).strip()
 
-        finally:
+        self.shown_article = f"【タイトル】\n{self.generated_title}\n\n{self.generated_body}"
+        self.result_box.setText(self.shown_article)
+
+        if parser.warnings:
+            self.status_label.setText("生成完了（形式の警告：" + " / ".join(parser.warnings) + "）")
+        else:
             self.status_label.setText("生成完了。コピーしてNOTEに投稿できます。")
-            self.generate_button.setEnabled(True)
-            QApplication.restoreOverrideCursor()
+
+    def cancel_generation(self):
+        if self.generate_worker:
+            self.generate_worker.cancel()
+
+    def finish_generation(self):
+        self.generate_worker = None
+        self.generate_button.setEnabled(True)
+        self.bundle_button.setEnabled(True)
+        self.cancel_button.setEnabled(False)
 
     # ===== コピー＆投稿補助 =====
     def copy_title(self):
@@ -210,91 +283,28 @@ NOTE用の記事を書いてください。
     def open_note(self):
         webbrowser.open("https://note.com/notes/create")
 
-    def detect_background_category(self, title: str) -> str:
-        if any(word in title for word in ["AI", "IT", "テクノロジー", "半導体"]):
-            return "it"
-        if any(word in title for word in ["株", "経済", "金融", "円", "インフレ"]):
-            return "economy"
-        if any(word in title for word in ["政府", "政策", "法案", "選挙"]):
-            return "policy"
-        if any(word in title for word in ["研究", "科学", "実験", "宇宙"]):
-            return "science"
-        return "default"
-        
     def generate_note_image(self):
         if not self.generated_title:
             self.status_label.setText("先に記事を生成してください。")
             return
 
-        try:
-            # ===== カテゴリ判定 =====
-            category = self.detect_background_category(self.generated_title)
-            # ===== ベース画像 =====
-            BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-            base_path = os.path.join(BASE_DIR, "assets", f"note_base_{category}.jpg")
-
-            if not os.path.exists(base_path):
-              base_path = os.path.join(
-                  BASE_DIR,
-                  "assets",
-                  "note_base_default.jpg"
-              )
-            image = Image.open(base_path).convert("RGB")
-            draw = ImageDraw.Draw(image)
-
-            # ===== フォント設定 =====
-            BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-
-            font_path = os.path.join(
-                BASE_DIR,
-                "assets",
-                "fonts",
-                "NotoSansJP-Regular.ttf"
-            )
-            title_font = ImageFont.truetype(font_path, 48)
-            date_font = ImageFont.truetype(font_path, 28)
-
-            # ===== テキスト =====
-            title = self.generated_title
-            date_text = datetime.now().strftime("%Y.%m.%d")
-
-            # ===== タイトル折り返し =====
-            max_width = 900
-            lines = []
-            current = ""
-
-            for char in title:
-                test = current + char
-
-                bbox = draw.textbbox((0, 0), test, font=title_font)
-                w = bbox[2] - bbox[0]
-
-                if w <= max_width:
-                    current = test
-                else:
-                    lines.append(current)
-                    current = char
-
-            if current:
-                lines.append(current)
-
-            # ===== 描画位置 =====
-            x = 100
-            y = 300
-            line_height = 60  # 行間（調整可）
-
-            for line in lines:
-                draw.text((x, y), line, font=title_font, fill="white")
-                y += line_height
-
-            draw.text((x, y + 20), date_text, font=date_font, fill="white")
-
-            # ===== 保存 =====
-            output_path = os.path.join("assets", "note_output.jpg")
-            image.save(output_path)
+        title = self.generated_title
+        self.generate_image_button.setEnabled(False)
+        self.status_label.setText("NOTE用画像を生成中です…")
+
+        start_worker(
+            render_note_image_job, title,
+            on_result=lambda files: self.status_label.setText(
+                f"NOTE用画像を {len(files)} 件書き出しました（{os.path.dirname(files[0]['path'])}）"
+            ),
+            on_error=lambda e: self.status_label.setText(f"画像生成エラー: {e}"),
+            on_finished=lambda: self.generate_image_button.setEnabled(True),
+        )
 
-            self.status_label.setText("NOTE用画像を生成しました。")
 
+def render_note_image_job(worker, title):
+    # PIL は画像生成を使うときだけ読み込む
+    from logic.note_image import export_images
 
-        except Exception as e:
-            self.status_label.setText(f"画像生成エラー: {e}")
+    # NOTE 見出し・X カード・YouTube サムネイル・プレビューを一度に書き出す
+    return export_images(title)
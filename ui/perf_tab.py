@@ -0,0 +1,62 @@
+from PySide6.QtWidgets import (
+    QWidget, QLabel, QVBoxLayout, QPushButton, QTableWidget, QTableWidgetItem
+)
+from PySide6.QtCore import QTimer
+
+from logic.perf import LOG_PATH, summary
+
+
+class PerfTab(QWidget):
+    """処理段階ごとの所要時間（p50 / p95）を表示する"""
+
+    COLUMNS = [
+        ("stage", "段階"),
+        ("count", "件数"),
+        ("p50_ms", "p50 (ms)"),
+        ("p95_ms", "p95 (ms)"),
+        ("max_ms", "最大 (ms)"),
+    ]
+    REFRESH_INTERVAL = 2000  # ミリ秒（タブが表示されている間だけ更新）
+
+    def __init__(self):
+        super().__init__()
+
+        layout = QVBoxLayout()
+
+        self.info_label = QLabel(f"直近の計測結果（ログ: {LOG_PATH}）")
+        layout.addWidget(self.info_label)
+
+        self.table = QTableWidget(0, len(self.COLUMNS))
+        self.table.setHorizontalHeaderLabels([label for _, label in self.COLUMNS])
+        self.table.horizontalHeader().setStretchLastSection(True)
+        self.table.setEditTriggers(QTableWidget.NoEditTriggers)
+        layout.addWidget(self.table)
+
+        self.refresh_button = QPushButton("更新")
+        self.refresh_button.clicked.connect(self.refresh)
+        layout.addWidget(self.refresh_button)
+
+        self.setLayout(layout)
+
+        self.timer = QTimer(self)
+        self.timer.setInterval(self.REFRESH_INTERVAL)
+        self.timer.timeout.connect(self.refresh)
+
+        self.refresh()
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.refresh()
+        self.timer.start()
+
+    def hideEvent(self, event):
+        super().hideEvent(event)
+        self.timer.stop()
+
+    def refresh(self):
+        rows = summary()
+        self.table.setRowCount(len(rows))
+        for row, stats in enumerate(rows):
+            for column, (key, _) in enumerate(self.COLUMNS):
+                self.table.setItem(row, column, QTableWidgetItem(str(stats[key])))
+        self.table.resizeColumnToContents(0)
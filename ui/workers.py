@@ -0,0 +1,134 @@
+"""バックグラウンド処理用のワーカー（QThreadPool / QRunnable）
+
+ネットワーク通信や Gemini 呼び出しを UI スレッドの外で実行し、
+進捗・結果・エラーはシグナルで UI スレッドに返す。
+"""
+
+import threading
+
+from PySide6.QtCore import QObject, QRunnable, QThreadPool, Signal
+
+from logic.gemini import generate_bundle, stream_text
+from logic.response_cache import cached_stream, default_cache
+
+
+class WorkerCancelled(Exception):
+    """ワーカーが中止されたことを表す例外"""
+
+
+class WorkerSignals(QObject):
+    progress = Signal(object)
+    result = Signal(object)
+    error = Signal(str)
+    cancelled = Signal()
+    finished = Signal()
+
+
+class Worker(QRunnable):
+    """fn(worker, *args, **kwargs) をスレッドプールで実行する
+
+    fn は worker.report() で進捗を送り、worker.check_cancelled() で
+    中止要求を確認できる。
+    """
+
+    def __init__(self, fn, *args, **kwargs):
+        super().__init__()
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.signals = WorkerSignals()
+        self._cancel_event = threading.Event()
+
+    def cancel(self):
+        self._cancel_event.set()
+
+    def is_cancelled(self):
+        return self._cancel_event.is_set()
+
+    def check_cancelled(self):
+        if self._cancel_event.is_set():
+            raise WorkerCancelled()
+
+    def report(self, value):
+        self.signals.progress.emit(value)
+
+    def run(self):
+        try:
+            result = self.fn(self, *self.args, **self.kwargs)
+        except WorkerCancelled:
+            self.signals.cancelled.emit()
+        except Exception as e:
+            self.signals.error.emit(str(e))
+        else:
+            if self.is_cancelled():
+                self.signals.cancelled.emit()
+            else:
+                self.signals.result.emit(result)
+        finally:
+            self.signals.finished.emit()
+
+
+# 実行中のワーカー（完了までシグナルオブジェクトを生かしておく）
+_active_workers = set()
+
+
+def start_worker(fn, *args, on_result=None, on_progress=None,
+                 on_error=None, on_cancelled=None, on_finished=None, **kwargs):
+    """ワーカーを作成してグローバルスレッドプールで開始する"""
+    worker = Worker(fn, *args, **kwargs)
+    worker.setAutoDelete(False)
+
+    if on_result:
+        worker.signals.result.connect(on_result)
+    if on_progress:
+        worker.signals.progress.connect(on_progress)
+    if on_error:
+        worker.signals.error.connect(on_error)
+    if on_cancelled:
+        worker.signals.cancelled.connect(on_cancelled)
+    if on_finished:
+        worker.signals.finished.connect(on_finished)
+
+    _active_workers.add(worker)
+    worker.signals.finished.connect(lambda: _active_workers.discard(worker))
+
+    QThreadPool.globalInstance().start(worker)
+    return worker
+
+
+def stream_generation(worker, client, prompt, cache_key=None, force=False):
+    """Gemini のストリーミング結果を progress で送りつつ全文を返すジョブ
+
+    cache_key を渡すと生成結果キャッシュを使う（force=True で再生成）。
+    """
+    if cache_key is None:
+        stream = stream_text(client, prompt)
+    else:
+        stream = cached_stream(
+            default_cache, cache_key,
+            lambda: stream_text(client, prompt),
+            force=force
+        )
+
+    chunks = []
+    for text in stream:
+        worker.check_cancelled()
+        chunks.append(text)
+        worker.report(text)
+    return "".join(chunks)
+
+
+def bundle_generation(worker, client, news_list, force=False):
+    """NOTE記事・Xスレッド・動画台本を並列生成するジョブ
+
+    progress には (種別, テキスト片) のタプルを送る。
+    結果は ({種別: 全文}, {種別: 例外}) で、失敗した種別があっても他は返す。
+    """
+    def on_chunk(kind, text):
+        worker.check_cancelled()
+        worker.report((kind, text))
+
+    results, errors = generate_bundle(client, news_list, force=force, on_chunk=on_chunk)
+    # 中止は種別ごとの失敗ではなく、ジョブ全体の中止として扱う
+    worker.check_cancelled()
+    return results, errors
@@ -1,25 +1,29 @@
 from PySide6.QtWidgets import (
     QWidget, QVBoxLayout, QLabel,
     QPushButton, QTextEdit,
-    QListWidget, QListWidgetItem,
-    QApplication
+    QListWidget, QCheckBox
 )
-from PySide6.QtCore import Qt
+from PySide6.QtGui import QTextCursor
 
-import feedparser
-from dotenv import load_dotenv
-import os
-from google import genai
+from logic.gemini import MODEL_NAME
+from logic.gemini_client import get_client
+from logic.prompts import build_x_thread_prompt, prompt_size_text
+from logic.response_cache import make_key
+from .news_list import NewsListMixin
+from .workers import start_worker, stream_generation
 
 
-class XTab(QWidget):
-    def __init__(self):
+class XTab(NewsListMixin, QWidget):
+    DISPLAY_LIMIT = 5  # カテゴリごとの表示件数
+    PERF_NAME = "x_tab"
+
+    def __init__(self, news_store):
         super().__init__()
 
+        self.news_store = news_store
+
         # Gemini 初期化
-        load_dotenv()
-        api_key = os.getenv("GEMINI_API_KEY")
-        self.client = genai.Client(api_key=api_key)
+        self.client = get_client()
 
         layout = QVBoxLayout()
 
@@ -48,103 +52,68 @@ class XTab(QWidget):
         self.generate_button.clicked.connect(self.generate_x_post)
         layout.addWidget(self.generate_button)
 
+        self.force_checkbox = QCheckBox("キャッシュを使わず再生成する")
+        layout.addWidget(self.force_checkbox)
+
+        # 中止ボタン
+        self.cancel_button = QPushButton("生成を中止")
+        self.cancel_button.setEnabled(False)
+        self.cancel_button.clicked.connect(self.cancel_generation)
+        layout.addWidget(self.cancel_button)
+
         # 結果表示
         self.result_box = QTextEdit()
         layout.addWidget(self.result_box)
 
         self.setLayout(layout)
 
-        # ニュースデータ保持用
-        self.news_entries = []
-
-    def load_news(self):
-        """Yahooニュースを取得して一覧表示"""
-        rss_urls = [
-            ("国内", "https://news.yahoo.co.jp/rss/topics/domestic.xml"),
-            ("経済", "https://news.yahoo.co.jp/rss/topics/business.xml"),
-            ("IT", "https://news.yahoo.co.jp/rss/topics/it.xml"),
-            ("科学", "https://news.yahoo.co.jp/rss/topics/science.xml"),
-        ]
-
-        self.news_list.clear()
-        self.news_entries = []
-
-        for category, url in rss_urls:
-            # カテゴリ見出し（選択不可）
-            header = QListWidgetItem(f"=== {category} ===")
-            header.setFlags(header.flags() & ~Qt.ItemIsSelectable)
-            self.news_list.addItem(header)
-
-            feed = feedparser.parse(url)
-            for entry in feed.entries[:5]:
-                index = len(self.news_entries)
-                self.news_entries.append({
-                    "title": entry.title,
-                    "summary": getattr(entry, "summary", "（概要なし）")
-                })
-
-                item = QListWidgetItem(f"[{category}] {entry.title}")
-                item.setData(Qt.UserRole, index)
-                self.news_list.addItem(item)
-
-        self.result_box.setText("ニュースを読み込みました。")
+        self.generate_worker = None
+
+        # 共有ニュースストアの更新を受け取る
+        self.connect_news_store()
 
     def generate_x_post(self):
         """選択されたニュースからX投稿文を生成"""
-        selected_items = self.news_list.selectedItems()
+        selected_news = self.selected_news()
 
-        if not selected_items:
+        if not selected_news:
             self.result_box.setText("ニュースが選択されていません。")
             return
 
+        prompt = build_x_thread_prompt(selected_news)
+        cache_key = make_key(MODEL_NAME, "x_thread", selected_news, self.client.base_url)
+
         # ===== 処理中表示 START =====
-        self.status_label.setText("X投稿文を生成中です…しばらくお待ちください")
+        self.status_label.setText(
+            f"X投稿文を生成中です…しばらくお待ちください（{prompt_size_text(prompt)}）"
+        )
         self.generate_button.setEnabled(False)
-        QApplication.setOverrideCursor(Qt.WaitCursor)
-        QApplication.processEvents()
+        self.cancel_button.setEnabled(True)
+        self.result_box.clear()
         # ===========================
 
-        try:
-            selected_news = []
-            for item in selected_items:
-                index = item.data(Qt.UserRole)
-                if index is not None:
-                    selected_news.append(self.news_entries[index])
-
-            news_text = ""
-            for i, news in enumerate(selected_news, start=1):
-                news_text += (
-                    f"【ニュース{i}】\n"
-                    f"タイトル: {news['title']}\n"
-                    f"概要: {news['summary']}\n\n"
-                )
-
-            prompt = f"""
-あなたは「デイリーニュースCFO マーク」です。
-
-以下のニュースを、X（旧Twitter）向けに
-1ニュース＝4〜5ポストのスレッド形式でまとめてください。
-
-【ルール】
-- 1ポスト140文字以内
-- 丁寧で落ち着いた口調
-- 煽らない
-- 絵文字なし
-- そのままコピペできる形式
-
-【ニュース】
-{news_text}
-"""
-
-            response = self.client.models.generate_content(
-                model="gemini-2.5-flash",
-                contents=prompt
-            )
-
-            self.result_box.setText(response.text)
-
-        finally:
-            # ===== 処理中表示 END =====
-            self.status_label.setText("生成が完了しました。")
-            self.generate_button.setEnabled(True)
-            QApplication.restoreOverrideCursor()
+        # 別スレッドで生成し、届いた分から順に表示する
+        self.generate_worker = start_worker(
+            stream_generation, self.client, prompt,
+            cache_key=cache_key,
+            force=self.force_checkbox.isChecked(),
+            on_progress=self.append_text,
+            on_result=lambda text: self.status_label.setText("生成が完了しました。"),
+            on_error=lambda e: self.status_label.setText(f"生成エラー: {e}"),
+            on_cancelled=lambda: self.status_label.setText("生成を中止しました。"),
+            on_finished=self.finish_generation,
+        )
+
+    def append_text(self, text):
+        self.result_box.moveCursor(QTextCursor.End)
+        self.result_box.insertPlainText(text)
+
+    def cancel_generation(self):
+        if self.generate_worker:
+            self.generate_worker.cancel()
+
+    def finish_generation(self):
+        # ===== 処理中表示 END =====
+        self.generate_worker = None
+        self.generate_button.setEnabled(True)
+        self.cancel_button.setEnabled(False)